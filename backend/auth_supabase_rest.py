@@ -22,6 +22,31 @@ SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY") or ""
 if not SUPABASE_URL or not SUPABASE_ANON_KEY:
     raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY environment variables are required")
 
+# One pooled client for all Supabase REST/Auth calls, so requests reuse open connections
+# instead of paying a TLS handshake each; HTTP/2 multiplexes concurrent queries (e.g. the
+# gathered collection fetches) over one connection. Closed on app shutdown in main.py
+http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_keepalive_connections=50, max_connections=100),
+)
+
+# Headers built once at import; per-request calls only add Authorization (and Prefer where needed)
+SUPABASE_BASE_HEADERS: Dict[str, str] = {
+    "apikey": SUPABASE_ANON_KEY,
+    "Content-Type": "application/json",
+}
+SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY", "")
+SUPABASE_SERVICE_HEADERS: Dict[str, str] = {
+    "apikey": SUPABASE_SERVICE_KEY,
+    "Authorization": f"Bearer {SUPABASE_SERVICE_KEY}",
+    "Content-Type": "application/json",
+}
+
+
+def supabase_headers(jwt_token: str) -> Dict[str, str]:
+    """Supabase request headers for the given user access token"""
+    return {**SUPABASE_BASE_HEADERS, "Authorization": f"Bearer {jwt_token}"}
+
 # Database Models (Pydantic) 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -57,189 +82,173 @@ class CollectionSave(BaseModel):
 class SupabaseRestClient:
     async def get_auth_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user from auth.users by looking up username in profiles table"""
-        async with httpx.AsyncClient() as client:
-            try:
-                # Look up user_id in profiles by username
-                response = await client.get(
-                    f"{self.base_url}/rest/v1/profiles?username=eq.{username}",
-                    headers=self.service_headers,
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    profiles = response.json()
-                    if profiles:
-                        user_id = profiles[0]["user_id"]
-                        # Now get auth user by user_id
-                        user_resp = await client.get(
-                            f"{self.base_url}/auth/v1/admin/users/{user_id}",
-                            headers=self.service_headers,
-                            timeout=10.0
-                        )
-                        if user_resp.status_code == 200:
-                            return user_resp.json()
-                        else:
-                            return None
+        try:
+            # Look up user_id in profiles by username
+            response = await http_client.get(
+                f"{self.base_url}/rest/v1/profiles?username=eq.{username}",
+                headers=self.service_headers,
+                timeout=10.0
+            )
+            if response.status_code == 200:
+                profiles = response.json()
+                if profiles:
+                    user_id = profiles[0]["user_id"]
+                    # Now get auth user by user_id
+                    user_resp = await http_client.get(
+                        f"{self.base_url}/auth/v1/admin/users/{user_id}",
+                        headers=self.service_headers,
+                        timeout=10.0
+                    )
+                    if user_resp.status_code == 200:
+                        return user_resp.json()
                     else:
                         return None
                 else:
                     return None
-            except Exception as e:
-                print(f"Error getting auth user by username: {e}")
+            else:
                 return None
+        except Exception as e:
+            print(f"Error getting auth user by username: {e}")
+            return None
     def __init__(self, jwt_token: Optional[str] = None):
         self.base_url = SUPABASE_URL
         self.jwt_token = jwt_token or ""
-        self.anon_headers: Dict[str, str] = {
-            "apikey": SUPABASE_ANON_KEY,
-            "Content-Type": "application/json"
-        }
-        if self.jwt_token:
-            self.anon_headers["Authorization"] = f"Bearer {self.jwt_token}"
+        self.anon_headers: Dict[str, str] = supabase_headers(self.jwt_token) if self.jwt_token else SUPABASE_BASE_HEADERS
         # Use service key for admin endpoints
-        self.service_key = os.getenv("SUPABASE_SERVICE_KEY", "")
-        self.service_headers: Dict[str, str] = {
-            "apikey": self.service_key,
-            "Authorization": f"Bearer {self.service_key}",
-            "Content-Type": "application/json"
-        }
+        self.service_key = SUPABASE_SERVICE_KEY
+        self.service_headers: Dict[str, str] = SUPABASE_SERVICE_HEADERS
 
     async def create_user_in_auth(self, email: str, password: str, username: str, full_name: str = "") -> Optional[Dict[str, Any]]:
         """Create user using the public signup endpoint (anon key), then create profile."""
-        async with httpx.AsyncClient() as client:
-            try:
-                signup_data: Dict[str, Any] = {
-                    "email": email,
-                    "password": password,
-                    "data": {
-                        "username": username,
-                        "full_name": full_name
-                    }
+        try:
+            signup_data: Dict[str, Any] = {
+                "email": email,
+                "password": password,
+                "data": {
+                    "username": username,
+                    "full_name": full_name
                 }
-                response = await client.post(
-                    f"{self.base_url}/auth/v1/signup",
-                    headers=self.anon_headers,
-                    json=signup_data,
-                    timeout=10.0
-                )
-                if response.status_code in [200, 201]:
-                    user = response.json()
-                    # Optionally, create profile in profiles table
-                    user_id = user.get("user", {}).get("id") or user.get("id")
-                    if user_id:
-                        await self.create_profile(user_id, full_name, username)
-                    return user
-                else:
-                    error_msg = f"User signup failed: {response.status_code} - {response.text}"
-                    print(error_msg)
-                    raise Exception(error_msg)
-            except Exception as e:
-                print(f"Error creating user: {e}")
-                raise
+            }
+            response = await http_client.post(
+                f"{self.base_url}/auth/v1/signup",
+                headers=self.anon_headers,
+                json=signup_data,
+                timeout=10.0
+            )
+            if response.status_code in [200, 201]:
+                user = response.json()
+                # Optionally, create profile in profiles table
+                user_id = user.get("user", {}).get("id") or user.get("id")
+                if user_id:
+                    await self.create_profile(user_id, full_name, username)
+                return user
+            else:
+                error_msg = f"User signup failed: {response.status_code} - {response.text}"
+                print(error_msg)
+                raise Exception(error_msg)
+        except Exception as e:
+            print(f"Error creating user: {e}")
+            raise
 
     async def get_auth_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user from auth.users by email using admin API"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/auth/v1/admin/users",
-                    headers=self.service_headers,
-                    params={"email": email},
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    users = response.json().get("users", [])
-                    if users:
-                        return users[0]
-                    else:
-                        return None
+        try:
+            response = await http_client.get(
+                f"{self.base_url}/auth/v1/admin/users",
+                headers=self.service_headers,
+                params={"email": email},
+                timeout=10.0
+            )
+            if response.status_code == 200:
+                users = response.json().get("users", [])
+                if users:
+                    return users[0]
                 else:
-                    error_msg = f"Auth user lookup failed: {response.status_code} - {response.text}"
-                    print(error_msg)
-                    raise Exception(error_msg)
-            except Exception as e:
-                print(f"Error getting auth user: {e}")
-                raise
+                    return None
+            else:
+                error_msg = f"Auth user lookup failed: {response.status_code} - {response.text}"
+                print(error_msg)
+                raise Exception(error_msg)
+        except Exception as e:
+            print(f"Error getting auth user: {e}")
+            raise
 
     async def verify_password_with_signin(self, email: str, password: str) -> Optional[Dict[str, Any]]:
         """Verify password using sign in endpoint"""
-        async with httpx.AsyncClient() as client:
-            try:
-                sign_in_data = {
-                    "email": email,
-                    "password": password
-                }
-                response = await client.post(
-                    f"{self.base_url}/auth/v1/token?grant_type=password",
-                    headers=self.anon_headers,
-                    json=sign_in_data,
-                    timeout=10.0
-                )
-                return response.json() if response.status_code == 200 else None
-            except Exception as e:
-                print(f"Error verifying password: {e}")
-                raise
+        try:
+            sign_in_data = {
+                "email": email,
+                "password": password
+            }
+            response = await http_client.post(
+                f"{self.base_url}/auth/v1/token?grant_type=password",
+                headers=self.anon_headers,
+                json=sign_in_data,
+                timeout=10.0
+            )
+            return response.json() if response.status_code == 200 else None
+        except Exception as e:
+            print(f"Error verifying password: {e}")
+            raise
 
     async def create_profile(self, user_id: str, full_name: str = "", username: str = "") -> Optional[Dict[str, Any]]:
         """Create user profile in profiles table, including username"""
-        async with httpx.AsyncClient() as client:
-            try:
-                profile_data: Dict[str, Any] = {
-                    "user_id": user_id,
-                    "full_name": full_name,
-                    "username": username,
-                    "updated_at": datetime.now(timezone.utc).isoformat()
-                }
-                headers = self.service_headers.copy()
-                headers["Prefer"] = "return=representation"
-                response = await client.post(
-                    f"{self.base_url}/rest/v1/profiles",
-                    headers=headers,
-                    json=profile_data,
-                    timeout=10.0
-                )
-                if response.status_code in [200, 201]:
-                    result: Dict[str, Any] = response.json() if isinstance(response.json(), dict) else {}
-                    if isinstance(result, list) and result:
-                        return result[0]  # type: ignore
-                    else:
-                        return result  # type: Dict[str, Any]
+        try:
+            profile_data: Dict[str, Any] = {
+                "user_id": user_id,
+                "full_name": full_name,
+                "username": username,
+                "updated_at": datetime.now(timezone.utc).isoformat()
+            }
+            headers = {**self.service_headers, "Prefer": "return=representation"}
+            response = await http_client.post(
+                f"{self.base_url}/rest/v1/profiles",
+                headers=headers,
+                json=profile_data,
+                timeout=10.0
+            )
+            if response.status_code in [200, 201]:
+                result: Dict[str, Any] = response.json() if isinstance(response.json(), dict) else {}
+                if isinstance(result, list) and result:
+                    return result[0]  # type: ignore
                 else:
-                    print("Profile creation failed:")
-                    print(f"Status: {response.status_code}")
-                    print(f"Headers: {response.headers}")
-                    print(f"Response text: {response.text}")
-                    try:
-                        print(f"Response JSON: {response.json()}")
-                    except Exception:
-                        pass
-                    error_msg = f"Profile creation failed: {response.status_code} - {response.text}"
-                    raise Exception(error_msg)
-            except Exception as e:
-                print(f"Error creating profile: {e}")
-                raise
+                    return result  # type: Dict[str, Any]
+            else:
+                print("Profile creation failed:")
+                print(f"Status: {response.status_code}")
+                print(f"Headers: {response.headers}")
+                print(f"Response text: {response.text}")
+                try:
+                    print(f"Response JSON: {response.json()}")
+                except Exception:
+                    pass
+                error_msg = f"Profile creation failed: {response.status_code} - {response.text}"
+                raise Exception(error_msg)
+        except Exception as e:
+            print(f"Error creating profile: {e}")
+            raise
 
     async def get_profile_by_user_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get profile by user_id"""
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{self.base_url}/rest/v1/profiles?user_id=eq.{user_id}",
-                    headers=self.service_headers,
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    profiles = response.json()
-                    if profiles:
-                        return profiles[0]
-                    else:
-                        return None
+        try:
+            response = await http_client.get(
+                f"{self.base_url}/rest/v1/profiles?user_id=eq.{user_id}",
+                headers=self.service_headers,
+                timeout=10.0
+            )
+            if response.status_code == 200:
+                profiles = response.json()
+                if profiles:
+                    return profiles[0]
                 else:
-                    error_msg = f"Profile lookup failed: {response.status_code} - {response.text}"
-                    print(error_msg)
-                    raise Exception(error_msg)
-            except Exception as e:
-                print(f"Error getting profile: {e}")
-                raise
+                    return None
+            else:
+                error_msg = f"Profile lookup failed: {response.status_code} - {response.text}"
+                print(error_msg)
+                raise Exception(error_msg)
+        except Exception as e:
+            print(f"Error getting profile: {e}")
+            raise
 
 # Initialize the client
 supabase_client = SupabaseRestClient()
@@ -257,91 +266,79 @@ class UserManager:
         if isinstance(jwt_token, dict):
             jwt_token = jwt_token.get("access_token") or ""
         async def fetch() -> List[Dict[str, Any]]:
-            async with httpx.AsyncClient() as client:
-                headers = {
-                    "apikey": SUPABASE_ANON_KEY,
-                    "Authorization": f"Bearer {jwt_token}",
-                    "Content-Type": "application/json",
-                }
-                resp = await client.get(
-                    f"{SUPABASE_URL}/rest/v1/collections?user_id=eq.{user_id}",
-                    headers=headers
-                )
-                if resp.status_code == 200:
-                    data = resp.json()
-                    if isinstance(data, list):
-                        return data  # type: ignore
-                    elif isinstance(data, dict):
-                        return [data]  # type: ignore
-                    else:
-                        return []
+            headers = supabase_headers(jwt_token)
+            resp = await http_client.get(
+                f"{SUPABASE_URL}/rest/v1/collections?user_id=eq.{user_id}",
+                headers=headers
+            )
+            if resp.status_code == 200:
+                data = resp.json()
+                if isinstance(data, list):
+                    return data  # type: ignore
+                elif isinstance(data, dict):
+                    return [data]  # type: ignore
                 else:
-                    print(f"Error fetching collections: {resp.text}")
                     return []
+            else:
+                print(f"Error fetching collections: {resp.text}")
+                return []
         return await fetch()
 
     @staticmethod
     async def save_collection(user_id: str, jwt_token: str, collection_data: 'CollectionSave') -> Optional[str]:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Authorization": f"Bearer {jwt_token}",
-                "Content-Type": "application/json",
-            }
-            resp = await client.post(
-                f"{SUPABASE_URL}/rest/v1/collections",
-                headers=headers,
-                json=collection_data
-            )
-            if resp.status_code == 201:
-                return resp.headers.get("Location")
-            else:
-                print(f"Error saving collection: {resp.text}")
-                return None
+        headers = {
+            "Authorization": f"Bearer {jwt_token}",
+            "Content-Type": "application/json",
+        }
+        resp = await http_client.post(
+            f"{SUPABASE_URL}/rest/v1/collections",
+            headers=headers,
+            json=collection_data
+        )
+        if resp.status_code == 201:
+            return resp.headers.get("Location")
+        else:
+            print(f"Error saving collection: {resp.text}")
+            return None
 
     @staticmethod
     async def get_user_settings(user_id: str, jwt_token: typing.Union[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         # If jwt_token is a dict, extract the actual access token
         if isinstance(jwt_token, dict):
             jwt_token = jwt_token.get("access_token") or ""
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "apikey": SUPABASE_ANON_KEY,
-                "Authorization": f"Bearer {jwt_token}",
-                "Content-Type": "application/json",
-            }
-            resp = await client.get(
-                f"{SUPABASE_URL}/rest/v1/user_settings?user_id=eq.{user_id}",
-                headers=headers
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                if isinstance(data, list):
-                    return typing.cast(Dict[str, Any], data[0]) if data else None
-                elif isinstance(data, dict):
-                    return typing.cast(Dict[str, Any], data)
-                else:
-                    return None
+        headers = supabase_headers(jwt_token)
+        resp = await http_client.get(
+            f"{SUPABASE_URL}/rest/v1/user_settings?user_id=eq.{user_id}",
+            headers=headers
+        )
+        if resp.status_code == 200:
+            data = resp.json()
+            if isinstance(data, list):
+                return typing.cast(Dict[str, Any], data[0]) if data else None
+            elif isinstance(data, dict):
+                return typing.cast(Dict[str, Any], data)
             else:
-                print(f"Error fetching user settings: {resp.text}")
                 return None
+        else:
+            print(f"Error fetching user settings: {resp.text}")
+            return None
 
     @staticmethod
     async def update_user_settings(user_id: str, jwt_token: str, settings: 'UserSettings') -> bool:
-        async with httpx.AsyncClient() as client:
-            headers = {
-                "Authorization": f"Bearer {jwt_token}",
-                "Content-Type": "application/json",
-            }
-            resp = await client.patch(
-                f"{SUPABASE_URL}/rest/v1/user_settings?user_id=eq.{user_id}",
-                headers=headers,
-                json=settings
-            )
-            if resp.status_code == 204:
-                return True
-            else:
-                print(f"Error updating user settings: {resp.text}")
-                return False
+        headers = {
+            "Authorization": f"Bearer {jwt_token}",
+            "Content-Type": "application/json",
+        }
+        resp = await http_client.patch(
+            f"{SUPABASE_URL}/rest/v1/user_settings?user_id=eq.{user_id}",
+            headers=headers,
+            json=settings
+        )
+        if resp.status_code == 204:
+            return True
+        else:
+            print(f"Error updating user settings: {resp.text}")
+            return False
 
     @staticmethod
     def hash_password(password: str) -> str:
@@ -430,16 +427,24 @@ async def fetch_supabase_jwks():
     if _JWK_CACHE["keys"] and now - _JWK_CACHE["fetched_at"] < _JWK_CACHE_TTL:
         return _JWK_CACHE["keys"]
     headers = {"apikey": SUPABASE_ANON_KEY}
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(get_supabase_jwks_url(), headers=headers)
-        resp.raise_for_status()
-        jwks = resp.json()
-        _JWK_CACHE["keys"] = jwks
-        _JWK_CACHE["fetched_at"] = now
-        return jwks
+    resp = await http_client.get(get_supabase_jwks_url(), headers=headers)
+    resp.raise_for_status()
+    jwks = resp.json()
+    _JWK_CACHE["keys"] = jwks
+    _JWK_CACHE["fetched_at"] = now
+    return jwks
+
+# --- Short-lived cache of resolved users, keyed by the raw JWT ---
+_USER_CACHE: Dict[str, typing.Tuple[float, Dict[str, Any]]] = {}
+_USER_CACHE_TTL = 60  # seconds
+_USER_CACHE_MAX = 10_000
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict[str, Any]:
     token = credentials.credentials
+    now = time.time()
+    cached = _USER_CACHE.get(token)
+    if cached and cached[0] > now:
+        return dict(cached[1])
     try:
         jwks = await fetch_supabase_jwks()
         headers = jose_jwt.get_unverified_header(token)
@@ -461,21 +466,16 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         email = payload.get("email")
         user_id = payload.get("sub")
         # Fetch profile info from public.profiles
-        async with httpx.AsyncClient() as client:
-            profile_resp = await client.get(
-                f"{SUPABASE_URL}/rest/v1/profiles?user_id=eq.{user_id}",
-                headers={
-                    "apikey": SUPABASE_ANON_KEY,
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                },
-                timeout=10.0
-            )
-            profile = None
-            if profile_resp.status_code == 200:
-                profiles = profile_resp.json()
-                if profiles:
-                    profile = profiles[0]
+        profile_resp = await http_client.get(
+            f"{SUPABASE_URL}/rest/v1/profiles?user_id=eq.{user_id}",
+            headers=supabase_headers(token),
+            timeout=10.0
+        )
+        profile = None
+        if profile_resp.status_code == 200:
+            profiles = profile_resp.json()
+            if profiles:
+                profile = profiles[0]
         app_metadata: Dict[str, Any] = payload.get("app_metadata") or {}
         role = app_metadata.get("role") or payload.get("role") or ""
         result: Dict[str, Any] = {
@@ -490,7 +490,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             "app_metadata": app_metadata,
             "user_metadata": payload.get("user_metadata"),
         }
-        return result
+        # Never serve a cached user past the token's own expiry
+        expires_at = now + _USER_CACHE_TTL
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, float(exp))
+        if len(_USER_CACHE) >= _USER_CACHE_MAX:
+            _USER_CACHE.pop(next(iter(_USER_CACHE)))
+        _USER_CACHE[token] = (expires_at, result)
+        return dict(result)
     except Exception:
         import traceback
         traceback.print_exc()
@@ -516,38 +524,28 @@ class UserSettings(BaseModel):
 # Collection management functions (placeholder implementations)
 async def get_user_collections(user_id: str, jwt_token: str) -> List[Dict[str, Any]]:
     """Get all collections for a user (placeholder implementation)"""
-    headers: Dict[str, str] = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Authorization": f"Bearer {jwt_token}",
-        "Content-Type": "application/json"
-    }
+    headers: Dict[str, str] = supabase_headers(jwt_token)
     async def fetch() -> List[Dict[str, Any]]:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{SUPABASE_URL}/rest/v1/collections?user_id=eq.{user_id}",
-                headers=headers
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                if isinstance(data, list):
-                    return data  # type: ignore
-                elif isinstance(data, dict):
-                    return [data]  # type: ignore
-                else:
-                    return []
+        resp = await http_client.get(
+            f"{SUPABASE_URL}/rest/v1/collections?user_id=eq.{user_id}",
+            headers=headers
+        )
+        if resp.status_code == 200:
+            data = resp.json()
+            if isinstance(data, list):
+                return data  # type: ignore
+            elif isinstance(data, dict):
+                return [data]  # type: ignore
             else:
-                print(f"Error fetching collections: {resp.text}")
                 return []
+        else:
+            print(f"Error fetching collections: {resp.text}")
+            return []
     return await fetch()
 
 async def save_collection(user_id: str, collection_data: CollectionSave, jwt_token: str) -> Optional[str]:
     """Save a collection for a user (placeholder implementation)"""
-    headers: Dict[str, str] = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Authorization": f"Bearer {jwt_token}",
-        "Content-Type": "application/json",
-        "Prefer": "return=representation"
-    }
+    headers: Dict[str, str] = {**supabase_headers(jwt_token), "Prefer": "return=representation"}
     payload: Dict[str, Any] = {
         "user_id": str(user_id),
         "name": str(collection_data.name),
@@ -556,118 +554,90 @@ async def save_collection(user_id: str, collection_data: CollectionSave, jwt_tok
         "is_public": bool(collection_data.is_public)
     }
     async def post() -> Optional[str]:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{SUPABASE_URL}/rest/v1/collections",
-                headers=headers,
-                json=payload
-            )
-            if resp.status_code in [200, 201]:
-                result = resp.json()
-                if isinstance(result, list) and result and "id" in result[0]:
-                    return str(result[0].get("id"))  # type: ignore
-                elif isinstance(result, dict) and "id" in result:
-                    return str(result.get("id", ""))  # type: ignore
-                else:
-                    return None
+        resp = await http_client.post(
+            f"{SUPABASE_URL}/rest/v1/collections",
+            headers=headers,
+            json=payload
+        )
+        if resp.status_code in [200, 201]:
+            result = resp.json()
+            if isinstance(result, list) and result and "id" in result[0]:
+                return str(result[0].get("id"))  # type: ignore
+            elif isinstance(result, dict) and "id" in result:
+                return str(result.get("id", ""))  # type: ignore
             else:
-                print(f"Error saving collection: {resp.text}")
                 return None
+        else:
+            print(f"Error saving collection: {resp.text}")
+            return None
     return await post()
 
 async def get_collection_by_id(user_id: str, collection_id: str, jwt_token: str) -> Optional[Dict[str, Any]]:
-    headers: Dict[str, str] = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Authorization": f"Bearer {jwt_token}",
-        "Content-Type": "application/json"
-    }
+    headers: Dict[str, str] = supabase_headers(jwt_token)
     async def fetch() -> Optional[Dict[str, Any]]:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{SUPABASE_URL}/rest/v1/collections?id=eq.{collection_id}&user_id=eq.{user_id}",
-                headers=headers
-            )
-            if resp.status_code == 200:
-                data = resp.json()
-                if isinstance(data, list) and data:
-                    return data[0]  # type: ignore
-                elif isinstance(data, dict):
-                    return typing.cast(Dict[str, Any], data)  # Explicit cast for type checker
-                else:
-                    return None
+        resp = await http_client.get(
+            f"{SUPABASE_URL}/rest/v1/collections?id=eq.{collection_id}&user_id=eq.{user_id}",
+            headers=headers
+        )
+        if resp.status_code == 200:
+            data = resp.json()
+            if isinstance(data, list) and data:
+                return data[0]  # type: ignore
+            elif isinstance(data, dict):
+                return typing.cast(Dict[str, Any], data)  # Explicit cast for type checker
             else:
-                print(f"Error fetching collection: {resp.text}")
                 return None
+        else:
+            print(f"Error fetching collection: {resp.text}")
+            return None
     return await fetch()
 
 async def update_collection(user_id: str, collection_id: str, data: Dict[str, Any], jwt_token: str) -> bool:
-    headers = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Authorization": f"Bearer {jwt_token}",
-        "Content-Type": "application/json",
-        "Prefer": "return=representation"
-    }
+    headers = {**supabase_headers(jwt_token), "Prefer": "return=representation"}
     async def patch():
-        async with httpx.AsyncClient() as client:
-            resp = await client.patch(
-                f"{SUPABASE_URL}/rest/v1/collections?id=eq.{collection_id}&user_id=eq.{user_id}",
-                headers=headers,
-                json=data
-            )
-            return resp.status_code in [200, 204]
+        resp = await http_client.patch(
+            f"{SUPABASE_URL}/rest/v1/collections?id=eq.{collection_id}&user_id=eq.{user_id}",
+            headers=headers,
+            json=data
+        )
+        return resp.status_code in [200, 204]
     return await patch()
 
 async def delete_collection(user_id: str, collection_id: str, jwt_token: str) -> bool:
-    headers = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Authorization": f"Bearer {jwt_token}",
-        "Content-Type": "application/json"
-    }
+    headers = supabase_headers(jwt_token)
     async def delete():
-        async with httpx.AsyncClient() as client:
-            resp = await client.delete(
-                f"{SUPABASE_URL}/rest/v1/collections?id=eq.{collection_id}&user_id=eq.{user_id}",
-                headers=headers
-            )
-            return resp.status_code in [200, 204]
+        resp = await http_client.delete(
+            f"{SUPABASE_URL}/rest/v1/collections?id=eq.{collection_id}&user_id=eq.{user_id}",
+            headers=headers
+        )
+        return resp.status_code in [200, 204]
     return await delete()
 
 async def get_user_settings(user_id: str, jwt_token: str) -> Optional[Dict[str, Any]]:
-    headers = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Authorization": f"Bearer {jwt_token}",
-        "Content-Type": "application/json"
-    }
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{SUPABASE_URL}/rest/v1/user_settings?id=eq.{user_id}",
-            headers=headers
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            if isinstance(data, list):
-                return typing.cast(Dict[str, Any], data[0]) if data else None
-            elif isinstance(data, dict):
-                return typing.cast(Dict[str, Any], data)
-            else:
-                return None
+    headers = supabase_headers(jwt_token)
+    resp = await http_client.get(
+        f"{SUPABASE_URL}/rest/v1/user_settings?id=eq.{user_id}",
+        headers=headers
+    )
+    if resp.status_code == 200:
+        data = resp.json()
+        if isinstance(data, list):
+            return typing.cast(Dict[str, Any], data[0]) if data else None
+        elif isinstance(data, dict):
+            return typing.cast(Dict[str, Any], data)
         else:
-            print(f"Error fetching user settings: {resp.text}")
             return None
+    else:
+        print(f"Error fetching user settings: {resp.text}")
+        return None
 
 async def update_user_settings(user_id: str, settings: UserSettings, jwt_token: str) -> bool:
-    headers = {
-        "apikey": SUPABASE_ANON_KEY,
-        "Authorization": f"Bearer {jwt_token}",
-        "Content-Type": "application/json",
-        "Prefer": "return=representation"
-    }
+    headers = {**supabase_headers(jwt_token), "Prefer": "return=representation"}
     async def patch():
-        async with httpx.AsyncClient() as client:
-            resp = await client.patch(
-                f"{SUPABASE_URL}/rest/v1/user_settings?id=eq.{user_id}",
-                headers=headers,
-                json=settings.model_dump(exclude_unset=True)
-            )
-            return resp.status_code in [200, 204]
+        resp = await http_client.patch(
+            f"{SUPABASE_URL}/rest/v1/user_settings?id=eq.{user_id}",
+            headers=headers,
+            json=settings.model_dump(exclude_unset=True)
+        )
+        return resp.status_code in [200, 204]
     return await patch()
@@ -2,6 +2,7 @@
 import json
 import re
 from typing import List, Dict, Any, Tuple, Optional, Union
+from rapidfuzz import fuzz, process
 from supabase import create_client, Client
 
 """
@@ -153,6 +154,7 @@ class CardLookup:
         self.card_id_map: Optional[Dict[str, List[str]]] = None
         self.card_list: Optional[List[Dict[str, Any]]] = None
         self.name_set_collector_map: Optional[Dict[Tuple[str, str, str], str]] = None
+        self.name_keys: Optional[List[str]] = None
 
     def connect(self):
         """Ensure Supabase client is initialized."""
@@ -238,6 +240,8 @@ class CardLookup:
                 if set_code and collector_number:
                     name_set_collector_map[(n, set_code, collector_number)] = id_
         self.card_id_map = name_to_ids
+        # Candidate list for fuzzy matching, built once instead of per lookup
+        self.name_keys = list(name_to_ids.keys())
         self.card_list = cards
         self.name_set_collector_map = name_set_collector_map
         if diagnostics:
@@ -280,17 +284,39 @@ class CardLookup:
         """
         Return a list of close matches for the normalized name (for diagnostics or user suggestions).
         """
-        import difflib
-        if self.card_id_map is None:
+        if self.card_id_map is None or self.name_keys is None:
             raise RuntimeError("Card data not loaded. Call fetch_all_cards() first.")
         norm_name = normalize_name(name)
-        return difflib.get_close_matches(
-            norm_name, list(self.card_id_map.keys()), n=n, cutoff=cutoff
+        matches = process.extract(
+            norm_name, self.name_keys, scorer=fuzz.ratio, limit=n, score_cutoff=cutoff * 100
         )
+        return [match for match, _score, _idx in matches]
+
+    def fuzzy_lookup_many(self, names: List[str], cutoff: float = 0.7, chunk_size: int = 256) -> List[Optional[str]]:
+        """
+        Best fuzzy match for each name (None below cutoff), scored in one multithreaded
+        rapidfuzz call per chunk of names instead of one Python scan per name.
+        """
+        if self.card_id_map is None or self.name_keys is None:
+            raise RuntimeError("Card data not loaded. Call fetch_all_cards() first.")
+        best: List[Optional[str]] = []
+        for i in range(0, len(names), chunk_size):
+            queries = [normalize_name(name) for name in names[i : i + chunk_size]]
+            # Scores below the cutoff come back as 0, so a zero row means no match
+            scores = process.cdist(
+                queries, self.name_keys, scorer=fuzz.ratio, score_cutoff=cutoff * 100, workers=-1
+            )
+            for row in scores:
+                idx = int(row.argmax())
+                best.append(self.name_keys[idx] if row[idx] > 0 else None)
+        return best
 
-    def robust_lookup(self, name: str, set_code: str, collector_number: str, diagnostics: bool = False) -> Dict[str, Any]:
+    def robust_lookup(
+        self, name: str, set_code: str, collector_number: str, diagnostics: bool = False, fuzzy: bool = True
+    ) -> Dict[str, Any]:
         """
         Robustly match a card using composite key, then fallback to name, then fuzzy match.
+        Pass fuzzy=False to skip the fuzzy step (e.g. to batch it with fuzzy_lookup_many).
         Returns a dict with match status, card_id, and diagnostics for frontend/user correction.
         """
         result: Dict[str, Any] = {
@@ -338,7 +364,7 @@ class CardLookup:
                     result["diagnostics"]["name_only_ids"] = ids
                 return result
             # 5. Fuzzy match
-            fuzzy_matches = self.fuzzy_lookup(name, n=3, cutoff=0.7)
+            fuzzy_matches = self.fuzzy_lookup(name, n=3, cutoff=0.7) if fuzzy else []
             if fuzzy_matches:
                 match_name = fuzzy_matches[0]
                 match_ids = self.card_id_map.get(match_name, [])
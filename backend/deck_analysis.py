@@ -1,6 +1,7 @@
 from collections import Counter
 from typing import Dict, List, Any, Optional, Union
 import os
+import re
 import sys
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -19,6 +20,30 @@ except ImportError:
         return MANA_CURVE_TARGETS.get(int(commander_cmc), MANA_CURVE_TARGETS[4])
 
 
+def keyword_pattern(*words: str) -> "re.Pattern[str]":
+    """Compile plain substrings into one alternation, so a card's text is scanned once per check"""
+    return re.compile("|".join(re.escape(word) for word in words))
+
+
+# Oracle text keyword checks used in the per-card loops below
+THEME_PATTERNS: Dict[str, "re.Pattern[str]"] = {
+    "tokens": keyword_pattern("token", "create", "populate"),
+    "graveyard": keyword_pattern("graveyard", "reanimate"),
+    "spellslinger": keyword_pattern("instant", "sorcery", "spell"),
+    "ramp": keyword_pattern("land", "ramp", "search"),
+    "card_draw": keyword_pattern("draw", "card"),
+    "removal": keyword_pattern("destroy", "exile", "counter"),
+}
+BALANCE_PATTERNS: Dict[str, "re.Pattern[str]"] = {
+    "ramp": keyword_pattern("land", "mana", "ramp", "search your library for a land"),
+    "card_draw": keyword_pattern("draw", "card"),
+    "removal": keyword_pattern("destroy", "exile", "return to hand"),
+    "board_wipes": keyword_pattern("all creatures", "each creature", "destroy all"),
+    "counterspells": keyword_pattern("counter target"),
+}
+WIN_CONDITION_PATTERN = keyword_pattern("win the game", "damage to each opponent")
+
+
 def analyze_deck_quality(deck_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Comprehensive deck quality analysis with scoring
@@ -310,22 +335,13 @@ def analyze_synergies(
                 creature_types.extend(subtypes)
 
         # Theme detection keywords
-        if any(word in oracle_text for word in ["token", "create", "populate"]):
-            themes["tokens"] += 1
-        if any(word in oracle_text for word in ["graveyard", "graveyard", "reanimate"]):
-            themes["graveyard"] += 1
+        for theme, pattern in THEME_PATTERNS.items():
+            if pattern.search(oracle_text):
+                themes[theme] += 1
         if "artifact" in type_line:
             themes["artifacts"] += 1
         if "enchantment" in type_line:
             themes["enchantments"] += 1
-        if any(word in oracle_text for word in ["instant", "sorcery", "spell"]):
-            themes["spellslinger"] += 1
-        if any(word in oracle_text for word in ["land", "ramp", "search"]):
-            themes["ramp"] += 1
-        if any(word in oracle_text for word in ["draw", "card"]):
-            themes["card_draw"] += 1
-        if any(word in oracle_text for word in ["destroy", "exile", "counter"]):
-            themes["removal"] += 1
 
     # Find most common creature type
     creature_type_counts: Counter[str] = Counter(creature_types)
@@ -374,36 +390,13 @@ def analyze_deck_balance(deck: List[Dict[str, Any]]) -> Dict[str, Any]:
         oracle_text = card.get("oracle_text", "").lower()
         cmc = card.get("cmc", 0)
 
-        # Ramp detection
-        if any(
-            word in oracle_text
-            for word in ["land", "mana", "ramp", "search your library for a land"]
-        ):
-            balance_categories["ramp"] += 1
-
-        # Card draw detection
-        if any(word in oracle_text for word in ["draw", "card"]):
-            balance_categories["card_draw"] += 1
-
-        # Removal detection
-        if any(word in oracle_text for word in ["destroy", "exile", "return to hand"]):
-            balance_categories["removal"] += 1
-
-        # Board wipe detection
-        if any(
-            word in oracle_text
-            for word in ["all creatures", "each creature", "destroy all"]
-        ):
-            balance_categories["board_wipes"] += 1
-
-        # Counterspell detection
-        if "counter target" in oracle_text:
-            balance_categories["counterspells"] += 1
+        # Ramp, card draw, removal, board wipe and counterspell detection
+        for category, pattern in BALANCE_PATTERNS.items():
+            if pattern.search(oracle_text):
+                balance_categories[category] += 1
 
         # Win condition detection (high CMC threats or combo pieces)
-        if cmc >= 6 or any(
-            word in oracle_text for word in ["win the game", "damage to each opponent"]
-        ):
+        if cmc >= 6 or WIN_CONDITION_PATTERN.search(oracle_text):
             balance_categories["win_conditions"] += 1
 
     # Calculate balance score based on having enough of each category
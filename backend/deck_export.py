@@ -102,16 +102,17 @@ def update_deck_details_in_supabase(
     result = supabase.table("saved_decks").update(update_data).eq("id", deck_id).execute()  # type: ignore
     return result
 
-def export_deck_to_txt(deck_data: Dict[str, Any], filename: Optional[str] = None) -> Tuple[str, str]:
+def export_deck_to_txt(deck_data: Dict[str, Any], filename: Optional[str] = None, save: bool = True) -> Tuple[str, Optional[str]]:
     """
     Export deck to MTGO/Arena compatible text format
     
     Args:
         deck_data: Dictionary from generate_commander_deck()
         filename: Optional filename, auto-generated if None
+        save: Write the text to the decks directory (skip when only the text is needed)
         
     Returns:
-        str: Formatted deck text
+        Tuple[str, Optional[str]]: Formatted deck text, and the file path if saved
     """
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -139,6 +140,8 @@ def export_deck_to_txt(deck_data: Dict[str, Any], filename: Optional[str] = None
         lines.append(f"1 {card_name}")
     
     deck_text = "\n".join(lines)
+    if not save:
+        return deck_text, None
     
     # Save to file
     decks_dir = os.path.join(os.path.dirname(__file__), "..", "decks")
@@ -151,16 +154,17 @@ def export_deck_to_txt(deck_data: Dict[str, Any], filename: Optional[str] = None
     return deck_text, filepath
 
 
-def export_deck_to_json(deck_data: Dict[str, Any], filename: Optional[str] = None) -> str:
+def export_deck_to_json(deck_data: Dict[str, Any], filename: Optional[str] = None, save: bool = True) -> Tuple[str, Optional[str]]:
     """
     Export deck to JSON format for programmatic use
     
     Args:
         deck_data: Dictionary from generate_commander_deck()
         filename: Optional filename, auto-generated if None
+        save: Write the JSON to the decks directory (skip when only the text is needed)
         
     Returns:
-        str: File path where JSON was saved
+        Tuple[str, Optional[str]]: JSON text, and the file path if saved
     """
     if filename is None:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -180,6 +184,9 @@ def export_deck_to_json(deck_data: Dict[str, Any], filename: Optional[str] = Non
             "version": "1.0"
         }
     }
+    json_text = json.dumps(export_data, indent=2, ensure_ascii=False)
+    if not save:
+        return json_text, None
     
     # Save to file
     decks_dir = os.path.join(os.path.dirname(__file__), "..", "decks")
@@ -187,9 +194,9 @@ def export_deck_to_json(deck_data: Dict[str, Any], filename: Optional[str] = Non
     
     filepath = os.path.join(decks_dir, filename)
     with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(export_data, f, indent=2, ensure_ascii=False)
+        f.write(json_text)
     
-    return filepath
+    return json_text, filepath
 
 
 def export_deck_to_moxfield(deck_data: Dict[str, Any]) -> str:
@@ -4,6 +4,7 @@ import traceback
 import structlog
 from typing import Dict, Any, List, Set, Optional, Union, Generator
 from collections import Counter
+from functools import lru_cache
 from cursor import normalize_name, CardLookup
 
 logger = structlog.get_logger()
@@ -169,8 +170,23 @@ def fetch_salt_list_from_supabase(card_pool: List[Dict[str, Any]]) -> Dict[str,
     return salt_map
 
 
+# Bounded: type lines come from user-supplied collections and the worker is long-lived
+@lru_cache(maxsize=4096)
+def commander_type_line(type_line: str) -> str:
+    """
+    Classify a raw type line for commander eligibility: 'creature' for legendary creatures,
+    'planeswalker' when the oracle text still needs checking, '' otherwise.
+    Type lines repeat heavily across a collection, so each distinct one is lowercased and searched once.
+    """
+    lowered = type_line.lower()
+    if "legendary creature" in lowered:
+        return "creature"
+    if "planeswalker" in lowered:
+        return "planeswalker"
+    return ""
+
+
 def find_valid_commanders(card_pool: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    print(f"[DEBUG] find_valid_commanders called with card_pool size: {len(card_pool)}")
     """
     Returns a list of cards from the card pool that are legal commanders:
     - Legendary creatures
@@ -178,17 +194,13 @@ def find_valid_commanders(card_pool: List[Dict[str, Any]]) -> List[Dict[str, Any
     """
     valid_commanders: List[Dict[str, Any]] = []
     for card in card_pool:
-        type_line = str(card.get("type_line", "")).lower()
-        oracle = str(card.get("oracle_text", "")).lower()
-        if "legendary creature" in type_line:
+        kind = commander_type_line(str(card.get("type_line", "")))
+        if kind == "creature":
             valid_commanders.append(card)
-            print(
-                f"[DEBUG]   Found valid legendary creature commander: {card.get('name')}"
-            )
-        elif "planeswalker" in type_line and "can be your commander" in oracle:
+        # Only planeswalkers need their oracle text lowercased and searched
+        elif kind == "planeswalker" and "can be your commander" in str(card.get("oracle_text", "")).lower():
             valid_commanders.append(card)
-            print(f"[DEBUG]   Found valid planeswalker commander: {card.get('name')}")
-    print(f"[DEBUG] Total valid commanders found: {len(valid_commanders)}")
+    logger.debug("Found valid commanders", card_pool=len(card_pool), commanders=len(valid_commanders))
     return valid_commanders
 
 
@@ -590,6 +602,10 @@ def select_lands(
     return final_lands[:num_lands]
 
 
+# House rules ban list for "unfun" cards (define your own list)
+HOUSE_RULES_UNFUN_CARDS = frozenset({"armageddon", "winter orb", "stasis"})
+
+
 def filter_card_pool(
     cards: List[Dict[str, Any]],
     commander: Dict[str, Any],
@@ -609,6 +625,11 @@ def filter_card_pool(
         f"[DEBUG] filter_card_pool called for commander: {commander.get('name')} | bracket: {bracket} | house_rules: {house_rules} | input pool size: {len(cards)}"
     )
     commander_colors = set(commander.get("color_identity", []))
+    # Rules that depend only on the request, decided once instead of per card
+    # (bracket 3 allows Game Changers here; the max of 3 is enforced during deck filling)
+    skip_game_changers = bracket in (1, 2)
+    # If salt_threshold >= 15, allow all cards (no salt filtering)
+    filter_salt = 0 < salt_weight_threshold < 15
     filtered: List[Dict[str, Any]] = []
     for card in cards:
         # Color identity: skip cards with colors outside the commander's identity
@@ -624,14 +645,11 @@ def filter_card_pool(
             )
             continue
         # Bracket/game changer: enforce bracket rules for Game Changers
-        if bracket in [1, 2] and card.get("game_changer", False):
+        if skip_game_changers and card.get("game_changer", False):
             print(
                 f"[DEBUG] filter_card_pool: Skipping {card.get('name')} (game changer, bracket {bracket})"
             )
             continue
-        if bracket == 3 and card.get("game_changer", False):
-            # We'll enforce max 3 later in deck filling
-            pass
         # House rules: ban certain cards or types
         if house_rules:
             name = card.get("name", "").lower()
@@ -647,7 +665,7 @@ def filter_card_pool(
                 )
                 continue
             # Example: ban "unfun" cards (define your own list)
-            if name in {"armageddon", "winter orb", "stasis"}:
+            if name in HOUSE_RULES_UNFUN_CARDS:
                 print(
                     f"[DEBUG] filter_card_pool: Skipping {card.get('name')} (house rules ban: unfun card)"
                 )
@@ -655,12 +673,7 @@ def filter_card_pool(
         # Salt filtering: skip cards with too high salt weight
         salt_weight = salt_list.get(card.get("name", ""), 0.0)
         card["salt_weight"] = salt_weight
-        # If salt_threshold >= 15, allow all cards (no salt filtering)
-        if (
-            salt_weight_threshold < 15
-            and salt_weight_threshold > 0
-            and salt_weight > salt_weight_threshold
-        ):
+        if filter_salt and salt_weight > salt_weight_threshold:
             print(
                 f"[DEBUG] filter_card_pool: Skipping {card.get('name')} (salt_weight {salt_weight} > threshold {salt_weight_threshold})"
             )
@@ -1469,5 +1482,33 @@ def generate_commander_deck(
         # Yield the final deck dictionary as a JSON object
         return json.dumps({"deck": deck_dict})
     except Exception as e:
-        logger.error("Exception in generate_commander_deck", error=str(e), traceback=traceback.format_exc())
-        return json.dumps({"error": f"Exception in deck generation: {str(e)}", "traceback": traceback.format_exc()})
\ No newline at end of file
+        tb = traceback.format_exc()
+        logger.error("Exception in generate_commander_deck", error=str(e), traceback=tb)
+        return json.dumps({"error": f"Exception in deck generation: {str(e)}", "traceback": tb})
+
+def run_deck_generation(
+    commander: Dict[str, Any],
+    card_pool: List[Dict[str, Any]],
+    bracket: int = 2,
+    house_rules: bool = False,
+    salt_threshold: int = 0,
+) -> Dict[str, Any]:
+    """
+    Runs generate_commander_deck to completion and returns the final deck dictionary.
+    Step messages are discarded. Kept at module level so it can be submitted to a process pool.
+    """
+    deck_gen = generate_commander_deck(
+        commander,
+        card_pool,
+        bracket=bracket,
+        house_rules=house_rules,
+        salt_threshold=salt_threshold,
+    )
+    try:
+        while True:
+            next(deck_gen)
+    except StopIteration as e:
+        result = json.loads(e.value) if e.value else {}
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result.get("deck", {})
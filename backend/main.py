@@ -1,29 +1,32 @@
 import json
-import io
+import orjson
 import pandas as pd
-import csv
+import pyarrow as pa
+import pyarrow.compute as pc
 import os
-import httpx
+import logging
 import structlog
-import numpy as np
-import traceback
 import glob
+import itertools
 import uvicorn
-import sys
+import time
 import uuid
 import asyncio
+import multiprocessing
 import redis
 import redis.asyncio as aioredis
 from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Query, Body, status, Form, Request
+from fastapi.encoders import jsonable_encoder
 from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, FileResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from utils import normalize_csv_format, expand_collection_by_quantity, enrich_single_row_with_scryfall, upsert_user_card, create_collection, update_collection, link_collection_card
+from utils import read_csv_arrow, detect_delimiter, normalize_csv_format, expand_collection_by_quantity, enrich_single_row_with_scryfall, upsert_user_cards_batch, create_collection, update_collection, link_collection_cards_batch
 from cursor import normalize_name
-from auth_supabase_rest import UserManager, get_user_from_token, get_current_user
+from auth_supabase_rest import UserManager, get_user_from_token, get_current_user, http_client, supabase_headers
 from deck_export import export_deck_to_txt, export_deck_to_json, export_deck_to_moxfield
-from deckgen import generate_commander_deck, find_valid_commanders
+from deckgen import find_valid_commanders, run_deck_generation
 from deck_analysis import analyze_deck_quality
 from pricing import enrich_collection_with_prices, calculate_collection_value
 from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
@@ -31,18 +34,37 @@ from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from sse_starlette.sse import EventSourceResponse
-from typing import Dict, Any, List, Optional, cast, AsyncGenerator
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union, cast, AsyncGenerator
 from cursor import CardLookup
 from dotenv import load_dotenv
 load_dotenv()
 
+# Drop events below LOG_LEVEL (default INFO); filtered calls return before any formatting or I/O
+structlog.configure(
+    wrapper_class=structlog.make_filtering_bound_logger(
+        logging.getLevelName(os.getenv("LOG_LEVEL", "INFO").upper())
+    ),
+)
 logger = structlog.get_logger()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
+SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or SUPABASE_ANON_KEY
+SUPABASE_REST_URL = f"{SUPABASE_URL}/rest/v1"
+SUPABASE_AUTH_URL = f"{SUPABASE_URL}/auth/v1"
 REDIS_URL = os.getenv("REDIS_URL")
 
-app = FastAPI(title="SparkRoot API", version="1.0.0")
+
+# Deck generation and analysis are CPU-bound; run them off the event loop.
+# Spawned workers avoid forking a process that already has running threads.
+# Every uvicorn worker builds its own pool (each process a full interpreter with pandas), so keep it small
+DECK_POOL = ProcessPoolExecutor(
+    max_workers=int(os.getenv("DECK_POOL_WORKERS", "2")),
+    mp_context=multiprocessing.get_context("spawn"),
+)
+
+app = FastAPI(title="SparkRoot API", version="1.0.0", default_response_class=ORJSONResponse)
 app.add_middleware(SentryAsgiMiddleware)
 redis_client: aioredis.Redis = aioredis.from_url(REDIS_URL, decode_responses=True) # type: ignore
 
@@ -54,6 +76,78 @@ r = redis.Redis(
     password=os.getenv("REDIS_PASSWORD"),
 )
 
+# Response cache TTLs (seconds). Game Changer cards only change with set releases;
+# availability checks fire per keystroke, so a short TTL absorbs the bursts
+CARDS_CACHE_TTL = 3600
+AVAILABILITY_CACHE_TTL = 5
+
+
+async def get_cached_response(key: str) -> Optional[Response]:
+    """Return a cached JSON response body from Redis, or None on a miss or Redis error"""
+    try:
+        cached = await redis_client.get(key)
+    except redis.RedisError as e:
+        logger.warning("Response cache read failed", key=key, error=str(e))
+        return None
+    return Response(content=cached, media_type="application/json") if cached else None
+
+
+async def cache_response(key: str, content: Any, ttl: int) -> Response:
+    """Encode content once, store it in Redis for ttl seconds, and return it as the response"""
+    body = orjson.dumps(jsonable_encoder(content))
+    try:
+        await redis_client.set(key, body, ex=ttl)
+    except redis.RedisError as e:
+        logger.warning("Response cache write failed", key=key, error=str(e))
+    return Response(content=body, media_type="application/json")
+
+
+# Per-process memo in front of Redis for availability checks, so typeahead repeats skip the network entirely
+AVAILABILITY_MEMO_SIZE = 4096
+_AVAILABILITY_MEMO: Dict[str, Tuple[float, bytes]] = {}
+
+
+async def get_cached_availability(key: str) -> Optional[Response]:
+    """Serve an availability answer from the process memo, then Redis"""
+    hit = _AVAILABILITY_MEMO.get(key)
+    if hit is not None:
+        if hit[0] > time.monotonic():
+            return Response(content=hit[1], media_type="application/json")
+        del _AVAILABILITY_MEMO[key]
+    return await get_cached_response(key)
+
+
+async def cache_availability(key: str, available: bool) -> Response:
+    """Store an availability answer in Redis and the process memo, evicting the oldest memo entry when full"""
+    response = await cache_response(key, {"available": available}, AVAILABILITY_CACHE_TTL)
+    if len(_AVAILABILITY_MEMO) >= AVAILABILITY_MEMO_SIZE:
+        del _AVAILABILITY_MEMO[next(iter(_AVAILABILITY_MEMO))]
+    _AVAILABILITY_MEMO[key] = (time.monotonic() + AVAILABILITY_CACHE_TTL, bytes(response.body))
+    return response
+
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def check_upload_size(request: Request, file: UploadFile) -> None:
+    """Reject oversized uploads from Content-Length or the spooled file size before reading any of it"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="File too large")
+
+
+async def read_upload_limited(file: UploadFile) -> bytes:
+    """Read an upload in chunks, raising 413 as soon as it passes MAX_UPLOAD_BYTES"""
+    buf = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="File too large")
+    return bytes(buf)
+
 # Enable CORS for frontend
 app.add_middleware(
     CORSMiddleware,
@@ -71,6 +165,18 @@ app.add_middleware(
     allow_headers=["*"],
     max_age=86400,  # Cache preflight for 1 day
 )
+# Compress large JSON payloads (parsed collections, inventory); SSE streams are left uncompressed
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+
+@app.on_event("shutdown")
+async def close_http_client() -> None:
+    await http_client.aclose()
+
+
+@app.on_event("shutdown")
+async def shutdown_deck_pool() -> None:
+    DECK_POOL.shutdown(wait=False, cancel_futures=True)
 
 
 class UserSettings(BaseModel):
@@ -95,56 +201,29 @@ class UserResponse(BaseModel):
     app_metadata: Optional[Dict[str, Any]] = None
 
 @app.post("/api/collections/enrich-csv")
-async def enrich_collection_csv(file: UploadFile = File(...)) -> Dict[str, Any]:
-    content = await file.read()
-    decoded = content.decode("utf-8")
-    sample = decoded[:1024]
-    sniffer = csv.Sniffer()
-    try:
-        dialect = sniffer.sniff(sample)
-        delimiter = dialect.delimiter
-    except Exception:
-        delimiter = ","
-    df = pd.read_csv(io.StringIO(decoded), delimiter=delimiter)  # type: ignore
+async def enrich_collection_csv(request: Request, file: UploadFile = File(...)) -> Dict[str, Any]:
+    check_upload_size(request, file)
+    content = await read_upload_limited(file)
+    # Count delimiter bytes in the head of the upload; Arrow parses the raw bytes without a decoded copy
+    delimiter = detect_delimiter(content[:8192])
+    # BufferReader wraps the bytes zero-copy for Arrow's reader
+    df = read_csv_arrow(pa.BufferReader(content), delimiter=delimiter)
     df = normalize_csv_format(df)
     df = expand_collection_by_quantity(df)
-    enriched: List[Dict[str, Any]] = []
-    for _, row in df.iterrows():  # type: ignore
-        row: pd.Series[Any] = row  # Explicit type annotation for row
-        enriched_row = await enrich_single_row_with_scryfall(row.to_dict())  # type: ignore[reportUnknownVariableType,reportUnknownMemberType]
-        enriched.append(enriched_row)
+    # Box cells as Python objects with None for NaN, so rows carry no numpy scalars into the response.
+    # Plain tuples zipped with the original headers keep CSV column names that aren't identifiers
+    boxed = df.astype(object).where(df.notna(), None)  # type: ignore
+    columns = list(boxed.columns)
+    rows: List[Dict[str, Any]] = [dict(zip(columns, values)) for values in boxed.itertuples(index=False, name=None)]
+    # Run the lookups concurrently; the asyncpg pool bounds how many hit the database at once
+    enriched: List[Dict[str, Any]] = await asyncio.gather(*(enrich_single_row_with_scryfall(row) for row in rows))  # type: ignore[reportUnknownVariableType,reportUnknownMemberType]
     return {"success": True, "enriched": enriched}
 
-def convert_numpy_types(collection: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Convert numpy types to native Python types for JSON serialization"""
-
-    for card in collection:
-        for key, value in card.items():
-            try:
-                if hasattr(value, "item"):
-                    card[key] = value.item()
-                elif value is None:
-                    card[key] = None
-                elif pd.isna(value):
-                    card[key] = None
-                elif isinstance(value, np.ndarray):
-                    card[key] = value.tolist()
-                elif isinstance(value, np.generic):
-                    card[key] = value.item()
-            except (ValueError, TypeError):
-                if isinstance(value, tuple):
-                    card[key] = list(value)  # type: ignore
-                elif isinstance(value, list):
-                    card[key] = value
-                else:
-                    card[key] = f"{value}"
-    return collection
-
 limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(
     RateLimitExceeded,
-    lambda r, e: JSONResponse(
+    lambda r, e: ORJSONResponse(
         status_code=429, content={"error": "Rate limit exceeded"}
     ),
 )
@@ -159,8 +238,9 @@ class DeckExportRequest(BaseModel):
 async def export_deck_txt(request: DeckExportRequest) -> Any:
     """Export deck to MTGO/Arena TXT format (file or text)."""
     try:
-        deck_text, filepath = export_deck_to_txt(request.deck_data)
-        if request.as_file:
+        # Only write to the decks directory when a file download was asked for
+        deck_text, filepath = export_deck_to_txt(request.deck_data, save=request.as_file)
+        if filepath:
             return FileResponse(
                 filepath, filename=filepath.split(os.sep)[-1], media_type="text/plain"
             )
@@ -173,15 +253,13 @@ async def export_deck_txt(request: DeckExportRequest) -> Any:
 async def export_deck_json(request: DeckExportRequest) -> Any:
     """Export deck to JSON format (file or text)."""
     try:
-        filepath = export_deck_to_json(request.deck_data)
-        if request.as_file:
+        json_text, filepath = export_deck_to_json(request.deck_data, save=request.as_file)
+        if filepath:
             return FileResponse(
                 filepath,
                 filename=filepath.split(os.sep)[-1],
                 media_type="application/json",
             )
-        with open(filepath, "r", encoding="utf-8") as f:
-            json_text = f.read()
         return PlainTextResponse(json_text, media_type="application/json")
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -282,48 +360,57 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "SparkRoot API"}
 
-@app.get("/api/auth/check-username")
+@app.get("/api/auth/check-username", response_model=None)
+@limiter.limit("60/minute")  # type: ignore
 async def check_username(
+    request: Request,
     username: str = Query(...),
     current_user: Dict[str, Any] = Depends(get_user_from_token)
-) -> dict[str, bool]:
+) -> Union[dict[str, bool], Response]:
     """Check if username is available (not taken)"""
+    # Usernames match case-sensitively (eq.), so the key keeps the input as typed
+    cache_key = f"cache:check-username:{username}"
+    cached = await get_cached_availability(cache_key)
+    if cached is not None:
+        return cached
     jwt_token = current_user["access_token"]
-    headers: Dict[str, str] = {
-        "apikey": str(SUPABASE_ANON_KEY or ""),
-        "Authorization": f"Bearer {str(jwt_token)}",
-        "Content-Type": "application/json",
-    }
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{SUPABASE_URL}/rest/v1/profiles?username=eq.{username}", headers=headers
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            return {"available": len(data) == 0}
-        return {"available": False}
+    # Let httpx encode the filter so "&", "?" or "," in a username can't alter the query.
+    # HEAD with an exact count returns the match count in Content-Range ("0-0/N" or "*/0") with no body
+    resp = await http_client.head(
+        f"{SUPABASE_REST_URL}/profiles",
+        params={"username": f"eq.{username}", "select": "id"},
+        headers={**supabase_headers(str(jwt_token)), "Prefer": "count=exact", "Range-Unit": "items", "Range": "0-0"},
+    )
+    content_range = resp.headers.get("content-range", "")
+    if resp.status_code in (200, 206) and "/" in content_range:
+        count = content_range.rsplit("/", 1)[1]
+        if count.isdigit():
+            return await cache_availability(cache_key, int(count) == 0)
+    return {"available": False}
 
 
 @app.get("/api/auth/check-email")
+@limiter.limit("60/minute")  # type: ignore
 async def check_email(
+    request: Request,
     email: str = Query(...),
     current_user: Dict[str, Any] = Depends(get_user_from_token)
 ):
     """Check if email is available (not taken)"""
+    # Auth stores emails lowercased, so case variants share one lookup and cache entry
+    email = email.strip().lower()
+    cache_key = f"cache:check-email:{email}"
+    cached = await get_cached_availability(cache_key)
+    if cached is not None:
+        return cached
     jwt_token = current_user["access_token"]
-    headers: Dict[str, str] = {
-        "apikey": str(SUPABASE_ANON_KEY),
-        "Authorization": f"Bearer {str(jwt_token)}",
-        "Content-Type": "application/json",
-    }
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            f"{SUPABASE_URL}/auth/v1/users?email=eq.{email}", headers=headers
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            return {"available": len(data) == 0}
-        return {"available": False}
+    resp = await http_client.get(
+        f"{SUPABASE_AUTH_URL}/users", params={"email": f"eq.{email}"}, headers=supabase_headers(str(jwt_token))
+    )
+    if resp.status_code == 200:
+        data = resp.json()
+        return await cache_availability(cache_key, len(data) == 0)
+    return {"available": False}
 
 
 @app.post("/api/auth/register", response_model=UserResponse)
@@ -420,8 +507,8 @@ async def get_current_user_info(
     return profile_info
 
 
-@app.get("/api/cards")
-async def get_cards(game_changer: Optional[bool] = Query(None)) -> Dict[str, Any]:
+@app.get("/api/cards", response_model=None)
+async def get_cards(game_changer: Optional[bool] = Query(None)) -> Union[Dict[str, Any], Response]:
     """
     Fetch cards from the cards table. Supports filtering by game_changer.
     If game_changer is True, only return the latest printing per oracle_id.
@@ -429,6 +516,11 @@ async def get_cards(game_changer: Optional[bool] = Query(None)) -> Dict[str, Any
     from supabase_db import db
     try:
         if game_changer:
+            # Only the Game Changer list is cached; the unfiltered table is too large for Redis
+            cache_key = "cache:cards:game_changer"
+            cached = await get_cached_response(cache_key)
+            if cached is not None:
+                return cached
             query = """
                 SELECT DISTINCT ON (oracle_id) *
                 FROM cards
@@ -436,6 +528,7 @@ async def get_cards(game_changer: Optional[bool] = Query(None)) -> Dict[str, Any
                 ORDER BY oracle_id, released_at DESC
             """
             rows = await db.execute_query(query, (), fetch=True)
+            return await cache_response(cache_key, {"success": True, "cards": rows}, CARDS_CACHE_TTL)
         else:
             query = "SELECT * FROM cards"
             rows = await db.execute_query(query, (), fetch=True)
@@ -444,8 +537,8 @@ async def get_cards(game_changer: Optional[bool] = Query(None)) -> Dict[str, Any
         return {"success": False, "error": str(e), "cards": []}
 
 # Collection management endpoints
-@app.get("/api/collections")
-async def get_user_collections(request: Request, current_user: Dict[str, Any] = Depends(get_user_from_token)) -> Dict[str, Any]:
+@app.get("/api/collections", response_model=None)
+async def get_user_collections(request: Request, current_user: Dict[str, Any] = Depends(get_user_from_token)) -> Union[Dict[str, Any], ORJSONResponse]:
     """Get all collections for the current user, including full card details for each collection"""
     try:
         user_id = current_user["id"]
@@ -453,44 +546,44 @@ async def get_user_collections(request: Request, current_user: Dict[str, Any] =
         jwt_token = ""
         if auth and auth.lower().startswith("bearer "):
             jwt_token = auth.split(" ", 1)[1]
-        supabase_api_key = os.getenv("SUPABASE_ANON_KEY")
-        if not supabase_api_key:
+        if not SUPABASE_ANON_KEY:
             raise Exception("Supabase API key not found in environment variables.")
         # Get collections
         collections = await UserManager.get_user_collections(user_id, jwt_token)
-        # For each collection, fetch all cards in one request
-        async with httpx.AsyncClient() as client:
-            for collection in collections:
-                collection_id = collection["id"]
-                # 1. Get collection_cards for this collection
-                resp = await client.get(
-                    f"{os.getenv('SUPABASE_URL')}/rest/v1/collection_cards",
-                    params={
-                        "collection_id": f"eq.{collection_id}",
-                        "select": "*,user_cards(*,cards(*))"
-                    },
-                    headers={
-                        "apikey": supabase_api_key,
-                        "Authorization": f"Bearer {jwt_token}",
-                        "Content-Type": "application/json"
-                    }
-                )
-                collection_cards: List[Dict[str, Any]] = resp.json() if resp.status_code == 200 else []
-                cards: List[Dict[str, Any]] = []
-                total_quantity = 0
-                for cc in collection_cards:
-                    user_card = cc.get("user_cards")
-                    card = user_card.get("cards") if user_card else None
-                    if not user_card or not card:
-                        continue
-                    quantity = user_card.get("quantity", 1)
-                    total_quantity += quantity
-                    merged: Dict[str, Any] = {**card, **user_card, "quantity": quantity}
-                    cards.append(merged)
-                collection["cards"] = cards
-                collection["total_cards"] = total_quantity
-                collection["unique_cards"] = len(cards)
-        return {"success": True, "collections": collections}
+        headers = supabase_headers(jwt_token)
+
+        async def fetch_collection_cards(collection: Dict[str, Any]) -> None:
+            # Get collection_cards for this collection, joined with user_cards and cards
+            resp = await http_client.get(
+                f"{SUPABASE_REST_URL}/collection_cards",
+                params={
+                    "collection_id": f"eq.{collection['id']}",
+                    "select": "*,user_cards(*,cards(*))"
+                },
+                headers=headers
+            )
+            collection_cards: List[Dict[str, Any]] = resp.json() if resp.status_code == 200 else []
+            cards: List[Dict[str, Any]] = []
+            total_quantity = 0
+            for cc in collection_cards:
+                user_card = cc.get("user_cards")
+                card = user_card.get("cards") if user_card else None
+                if not user_card or not card:
+                    continue
+                quantity = user_card.get("quantity", 1)
+                total_quantity += quantity
+                merged: Dict[str, Any] = {**card, **user_card, "quantity": quantity}
+                cards.append(merged)
+            collection["cards"] = cards
+            collection["total_cards"] = total_quantity
+            collection["unique_cards"] = len(cards)
+
+        # Fetch every collection's cards concurrently rather than one round trip after another.
+        # Kept per collection so each stays under PostgREST's max-rows cap on its own
+        await asyncio.gather(*(fetch_collection_cards(collection) for collection in collections))
+        # Rows are plain JSON from Supabase, so orjson can encode them directly without
+        # FastAPI's recursive jsonable_encoder walk over every card field
+        return ORJSONResponse({"success": True, "collections": collections})
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -505,8 +598,8 @@ async def get_collection(collection_id: str, current_user: Dict[str, Any] = Depe
     )
 
 # User inventory endpoint: returns all user_cards for the user, joined with card details
-@app.get("/api/inventory")
-async def get_user_inventory(request: Request, current_user: Dict[str, Any] = Depends(get_user_from_token)) -> Dict[str, Any]:
+@app.get("/api/inventory", response_model=None)
+async def get_user_inventory(request: Request, current_user: Dict[str, Any] = Depends(get_user_from_token)) -> Union[Dict[str, Any], StreamingResponse]:
     """Get the user's full inventory (all user_cards, not just those in collections)"""
     try:
         user_id = current_user["id"]
@@ -514,46 +607,55 @@ async def get_user_inventory(request: Request, current_user: Dict[str, Any] = De
         jwt_token = ""
         if auth and auth.lower().startswith("bearer "):
             jwt_token = auth.split(" ", 1)[1]
-        supabase_api_key = os.getenv("SUPABASE_ANON_KEY")
-        if not supabase_api_key:
+        if not SUPABASE_ANON_KEY:
             raise Exception("Supabase API key not found in environment variables.")
         # Query all user_cards for this user, join with cards table
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{os.getenv('SUPABASE_URL')}/rest/v1/user_cards",
-                params={
-                    "user_id": f"eq.{user_id}",
-                    "select": "*,cards(*)"
-                },
-                headers={
-                    "apikey": supabase_api_key,
-                    "Authorization": f"Bearer {jwt_token}",
-                    "Content-Type": "application/json"
-                }
-            )
-            user_cards: List[Dict[str, Any]] = resp.json() if resp.status_code == 200 else []
-            cards: List[Dict[str, Any]] = []
+        resp = await http_client.get(
+            f"{SUPABASE_REST_URL}/user_cards",
+            params={
+                "user_id": f"eq.{user_id}",
+                "select": "*,cards(*)"
+            },
+            headers=supabase_headers(jwt_token)
+        )
+        user_cards: List[Dict[str, Any]] = resp.json() if resp.status_code == 200 else []
+        inventory_header: Dict[str, Any] = {
+            "id": "inventory",
+            "user_id": user_id,
+            "name": "My Inventory",
+            "description": "All cards in your account, across all collections.",
+            "created_at": None,
+            "updated_at": None,
+        }
+
+        async def inventory_body() -> AsyncGenerator[bytes, None]:
+            # Stream the merged cards as they are built, then append the totals counted in the same pass.
+            # "success" goes last: once the 200 and the first bytes are out, a failure mid-stream can
+            # still close valid JSON that reports it instead of leaving a truncated body
+            header = orjson.dumps(inventory_header)
+            yield b'{"inventory":' + header[:-1] + b',"cards":['
             total_quantity = 0
-            for uc in user_cards:
-                card = uc.get("cards")
-                if not card:
-                    continue
-                quantity = uc.get("quantity", 1)
-                total_quantity += quantity
-                merged: Dict[str, Any] = {**card, **uc, "quantity": quantity}
-                cards.append(merged)
-            inventory: Dict[str, Any] = {
-                "id": "inventory",
-                "user_id": user_id,
-                "name": "My Inventory",
-                "description": "All cards in your account, across all collections.",
-                "cards": cards,
-                "created_at": None,
-                "updated_at": None,
-                "total_cards": total_quantity,
-                "unique_cards": len({c.get("id") or c.get("name") for c in cards}),
-            }
-        return {"success": True, "inventory": inventory}
+            unique_ids: set[Any] = set()
+            first = True
+            status = b',"success":true}'
+            try:
+                for uc in user_cards:
+                    card = uc.get("cards")
+                    if not card:
+                        continue
+                    quantity = int(uc.get("quantity") or 1)
+                    merged: Dict[str, Any] = {**card, **uc, "quantity": quantity}
+                    chunk = orjson.dumps(merged)
+                    total_quantity += quantity
+                    unique_ids.add(merged.get("id") or merged.get("name"))
+                    yield (b"" if first else b",") + chunk
+                    first = False
+            except Exception as e:
+                logger.exception("Streaming inventory failed", user_id=user_id)
+                status = b',"success":false,"error":' + orjson.dumps(str(e)) + b"}"
+            yield b'],"total_cards":' + orjson.dumps(total_quantity) + b',"unique_cards":' + orjson.dumps(len(unique_ids)) + b"}" + status
+
+        return StreamingResponse(inventory_body(), media_type="application/json")
     except Exception as e:
         return {"success": False, "error": str(e)}
 
@@ -565,9 +667,7 @@ async def get_user_settings(request: Request, current_user: Dict[str, Any] = Dep
     jwt_token = ""
     if auth and auth.lower().startswith("bearer "):
         jwt_token = auth.split(" ", 1)[1]
-    import os
-    supabase_api_key = os.getenv("SUPABASE_ANON_KEY")
-    if not supabase_api_key:
+    if not SUPABASE_ANON_KEY:
         raise Exception("Supabase API key not found in environment variables.")
     # Patch UserManager.get_user_settings to ensure API key is used
     settings = await UserManager.get_user_settings(user_id, jwt_token)
@@ -576,7 +676,6 @@ async def get_user_settings(request: Request, current_user: Dict[str, Any] = Dep
 # Password change endpoint
 @app.post("/api/auth/update-password")
 @limiter.limit("3/minute")  # type: ignore
-@limiter.limit("5/minute")  # type: ignore
 async def update_password(
     request: UpdatePasswordRequest,
     credentials: HTTPAuthorizationCredentials = Depends(),
@@ -590,20 +689,14 @@ async def update_password(
     if not current_password or not new_password:
         raise HTTPException(status_code=400, detail="Missing current or new password")
     logger.info("User requested password change", user_id=user_id)
-    headers: Dict[str, str] = {
-        "apikey": str(SUPABASE_ANON_KEY),
-        "Authorization": f"Bearer {str(jwt_token)}",
-        "Content-Type": "application/json",
-    }
-    async with httpx.AsyncClient() as client:
-        resp = await client.patch(
-            f"{SUPABASE_URL}/auth/v1/users/{user_id}",
-            headers=headers,
-            json={"password": new_password},
-        )
-        if resp.status_code == 200:
-            return {"success": True, "message": "Password updated"}
-        raise HTTPException(status_code=400, detail="Failed to update password")
+    resp = await http_client.patch(
+        f"{SUPABASE_AUTH_URL}/users/{user_id}",
+        headers=supabase_headers(str(jwt_token)),
+        json={"password": new_password},
+    )
+    if resp.status_code == 200:
+        return {"success": True, "message": "Password updated"}
+    raise HTTPException(status_code=400, detail="Failed to update password")
 
 
 class PricingRequest(BaseModel):
@@ -614,41 +707,82 @@ class PricingRequest(BaseModel):
 # Pricing enrichment endpoint
 
 
+# Columns returned by the parse endpoints unless the client asks for others via ?fields=
+PARSED_COLLECTION_FIELDS = (
+    "Name",
+    "Set code",
+    "Set name",
+    "Collector number",
+    "Quantity",
+    "Foil",
+    "Condition",
+    "Language",
+    "Rarity",
+    "Scryfall ID",
+    "Purchase price",
+)
+
+
+def build_parsed_collection(df: pd.DataFrame, requested: Sequence[str]) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Normalize a parsed upload and return its rows (only the requested columns) and card counts"""
+    df = normalize_csv_format(df)
+    # Only serialize the columns the client will render
+    projected_df = df[[col for col in requested if col in df.columns]]
+    collection: List[Dict[str, Any]] = pa.Table.from_pandas(projected_df, preserve_index=False).to_pylist()
+    stats: Dict[str, Any] = {
+        "total_cards": len(collection),
+        "unique_cards": int(df["Name"].nunique()) if "Name" in df.columns else len(collection),
+        "total_quantity": int(pd.to_numeric(df["Quantity"], errors="coerce").fillna(1).sum()),  # type: ignore
+    }
+    return collection, stats
+
+
+async def read_upload_csv(file: UploadFile) -> pd.DataFrame:
+    """Parse an upload straight from its spooled file with Arrow, without buffering the body or a decoded copy"""
+    try:
+        await file.seek(0)
+        return await asyncio.to_thread(read_csv_arrow, file.file)
+    except pa.ArrowInvalid:
+        # Not valid UTF-8; retry with latin-1, which decodes every byte
+        await file.seek(0)
+        return await asyncio.to_thread(read_csv_arrow, file.file, encoding="latin-1")
+
 # Public collection parsing (no authentication required)
 @app.post("/api/parse-collection-public")
-async def parse_collection_public(file: UploadFile = File(...)) -> Any:
+async def parse_collection_public(
+    request: Request,
+    file: UploadFile = File(...),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return"),
+) -> Any:
+    check_upload_size(request, file)
     try:
-        # Read the uploaded file
-        contents = await file.read()
-        df = None
         try:
-            df = pd.read_csv(io.StringIO(contents.decode("utf-8")))  # type: ignore
-        except UnicodeDecodeError:
-            try:
-                df = pd.read_csv(io.StringIO(contents.decode("latin-1")))  # type: ignore
-            except UnicodeDecodeError:
-                df = pd.read_csv(io.StringIO(contents.decode("cp1252")))  # type: ignore
+            df = await read_upload_csv(file)
         except Exception as e:
             return cast(Dict[str, Any], {"success": False, "error": f"Failed to parse CSV: {str(e)}"})
-        # DataFrame will never be None here; this check is redundant and removed.
-        print(f"Uploaded file: {file.filename}")
-        print(f"Detected columns: {list(df.columns)}")
-        print(f"Number of rows: {len(df)}")
-        # Save the uploaded collection to user-data directory with a generic name
+        logger.debug("Parsed uploaded collection", filename=file.filename, columns=list(df.columns), rows=len(df))
+        requested = [f.strip() for f in fields.split(",") if f.strip()] if fields else PARSED_COLLECTION_FIELDS
+        # Normalizing and converting rows is CPU-bound pandas/Arrow work; keep it off the event loop
+        collection, stats = await asyncio.to_thread(build_parsed_collection, df, requested)
+        stats["original_filename"] = file.filename
+        return {"success": True, "collection": collection, "stats": stats}
     except Exception as e:
+        logger.exception("Parsing public collection failed")
         return cast(Dict[str, Any], {"success": False, "error": str(e)})
 
-@app.post("/api/pricing/enrich-collection")
+@app.post("/api/pricing/enrich-collection", response_model=None)
 async def enrich_collection_pricing(
     request: PricingRequest,
     current_user: Dict[str, Any] = Depends(get_user_from_token)
-) -> Dict[str, Any]:
+) -> Union[Dict[str, Any], ORJSONResponse]:
     try:
         enriched_collection: List[Dict[str, Any]] = await enrich_collection_with_prices(
             request.collection, request.source
         )  # type: ignore[reportUnknownVariableType,reportUnknownMemberType]
         value_stats: Dict[str, Any] = calculate_collection_value(enriched_collection)  # type: ignore[reportUnknownVariableType,reportUnknownMemberType]
-        return {"success": True, "enriched": enriched_collection, "stats": value_stats}
+        # The request's JSON cards plus float/str price data, so orjson encodes them as-is
+        # without validating and re-encoding the whole collection against the return annotation
+        return ORJSONResponse({"success": True, "enriched": enriched_collection, "stats": value_stats})
     except Exception as e:
         error_details = str(e)
         return cast(Dict[str, Any], {"success": False, "error": str(e), "details": error_details})
@@ -677,10 +811,10 @@ async def get_collection_value_public(request: PricingRequest) -> Any:
 # Optional authentication for collection endpoints
 @app.post("/api/parse-collection")
 async def parse_collection_authenticated(
-file: UploadFile = File(...), current_user: Dict[str, Any] = Depends(get_user_from_token)
+request: Request, file: UploadFile = File(...), fields: Optional[str] = Query(None), current_user: Dict[str, Any] = Depends(get_user_from_token)
 ):
     # Use the same logic as the public endpoint but associate with user
-    result: Optional[Dict[str, Any]] = await parse_collection_public(file)
+    result: Optional[Dict[str, Any]] = await parse_collection_public(request=request, file=file, fields=fields)
 
     # If successful and user wants to save it, we can do that here
     if result is not None and result.get("success") and current_user:
@@ -706,7 +840,7 @@ file: UploadFile = File(...), current_user: Dict[str, Any] = Depends(get_user_fr
 async def find_commanders(request: DeckAnalysisRequest) -> Dict[str, Any]:
     try:
         collection = request.collection
-        commanders = find_valid_commanders(collection)
+        commanders = await asyncio.to_thread(find_valid_commanders, collection)
 
         return {"success": True, "commanders": commanders, "count": len(commanders)}
 
@@ -726,57 +860,46 @@ async def generate_deck(
         salt_threshold = getattr(request, "salt_threshold", 0)
         house_rules = getattr(request, "house_rules", False)
 
-        # Convert to list of dicts
-        card_pool = list(collection)
-
-        # Find the selected commander
-        selected_commander = next(
-            (card for card in collection if card.get("id") == commander_id or card.get("scryfall_id") == commander_id),
-            None
-        )
+        # Find the selected commander by id or scryfall_id in one pass
+        commander_index: Dict[str, Dict[str, Any]] = {}
+        for card in collection:
+            card_id = card.get("id")
+            scryfall_id = card.get("scryfall_id")
+            if scryfall_id:
+                commander_index.setdefault(scryfall_id, card)
+            if card_id:
+                commander_index.setdefault(card_id, card)
+        selected_commander = commander_index.get(commander_id) if commander_id else None
         if not selected_commander:
             return {"success": False, "error": "Commander not found"}
 
         # Enrich commander if missing fields (optional, as in your code)
         if selected_commander and "name" not in selected_commander:
             jwt_token = user["access_token"]
-            async with httpx.AsyncClient() as client:
-                resp = await client.get(
-                    f"{SUPABASE_URL}/rest/v1/cards",
-                    params={"id": f"eq.{selected_commander.get('id')}", "select": "*"},
-                    headers={
-                        "apikey": str(SUPABASE_ANON_KEY or ""),
-                        "Authorization": f"Bearer {str(jwt_token)}",
-                    }
-                )
-                if resp.status_code == 200 and resp.json():
-                    selected_commander = resp.json()[0]
-
-        # Generate deck (synchronous, not streaming)
-        deck_gen = generate_commander_deck(
+            resp = await http_client.get(
+                f"{SUPABASE_REST_URL}/cards",
+                params={"id": f"eq.{selected_commander.get('id')}", "select": "*"},
+                headers=supabase_headers(str(jwt_token))
+            )
+            if resp.status_code == 200 and resp.json():
+                selected_commander = resp.json()[0]
+
+        # Generate deck (synchronous, not streaming) in the process pool
+        loop = asyncio.get_running_loop()
+        deck_data: Dict[str, Any] = await loop.run_in_executor(
+            DECK_POOL,
+            run_deck_generation,
             selected_commander,
-            card_pool,
-            bracket=bracket,
-            house_rules=house_rules,
-            salt_threshold=salt_threshold,
+            collection,
+            bracket,
+            house_rules,
+            salt_threshold,
         )
-        deck_data: Dict[str, Any] = {}
-        if hasattr(deck_gen, '__iter__') and not isinstance(deck_gen, dict):
-            for step in deck_gen:
-                try:
-                    maybe_data = json.loads(step)
-                except Exception:
-                    maybe_data = step
-                # Only assign if it's a dict with a 'cards' key (final yield)
-                if isinstance(maybe_data, dict) and 'cards' in maybe_data:
-                    deck_data = cast(Dict[str, Any], maybe_data)  # assign the whole dict, not just maybe_data['cards']
-        else:
-            deck_data = cast(Dict[str, Any], deck_gen)  # type: ignore[assignment]
         if 'cards' not in deck_data:
             raise Exception("Deck generation did not return a valid deck dictionary.")
 
         # Analyze deck quality and get statistics
-        deck_analysis = analyze_deck_quality(deck_data)
+        deck_analysis = await loop.run_in_executor(DECK_POOL, analyze_deck_quality, deck_data)
 
         return {
             "success": True,
@@ -813,18 +936,22 @@ async def generate_deck_get(
     async def event_generator():
         try:
             while True:
+                # One round trip per poll: take and clear all pending progress messages, then read
+                # status and result. MULTI keeps that order, so no message pushed before the final
+                # status can be skipped
+                async with redis_client.pipeline(transaction=True) as pipe:
+                    pipe.lrange(f"deckjob:{job_id}:progress", 0, -1)
+                    pipe.delete(f"deckjob:{job_id}:progress")
+                    pipe.get(f"deckjob:{job_id}:status")
+                    pipe.get(f"deckjob:{job_id}:result")
+                    messages, _, status, result = await pipe.execute()  # type: ignore
                 # Stream all available progress messages
-                while True:
-                    msg = await redis_client.lpop(f"deckjob:{job_id}:progress")  # type: ignore
-                    if msg is None:
-                        break
+                for msg in messages:
                     if not isinstance(msg, str):
                         msg = json.dumps(msg)
                     yield f"event: step\ndata: {msg}\n\n"
-                status = await redis_client.get(f"deckjob:{job_id}:status")
                 if status in ("complete", "failed"):
                     # Optionally yield the final result
-                    result = await redis_client.get(f"deckjob:{job_id}:result")
                     if result:
                         yield f"event: deck\ndata: {result}\n\n"
                     # --- CLEANUP: delete all job keys after sending final deck ---
@@ -842,97 +969,173 @@ async def generate_deck_get(
     return EventSourceResponse(event_generator())
 
 
-@app.get("/api/load-sample-collection")
-async def load_sample_collection() -> Dict[str, Any]:
+# Parsed sample collections by path, with the CSV mtime they were read at, plus their Arrow
+# table and counts. They are only read by load_sample_collection, so one copy is shared across requests
+SampleCollection = Tuple[pd.DataFrame, pa.Table, Dict[str, int]]
+_SAMPLE_CACHE: Dict[str, Tuple[float, SampleCollection]] = {}
+
+
+def summarize_sample_collection(df: pd.DataFrame) -> SampleCollection:
+    """Build the Arrow table served for a sample collection and its card counts"""
+    # Arrow emits native Python types (None for nulls) and string keys,
+    # so no numpy-scalar conversion pass is needed on the way out
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    name_col = next((col for col in ("name", "Name") if col in table.column_names), None)
+    unique_names = (
+        pc.count_distinct(table[name_col], mode="only_valid").as_py()
+        if name_col
+        else table.num_rows
+    )
+    total_quantity = (
+        pc.sum(table["Quantity"], min_count=0).as_py()
+        if "Quantity" in table.column_names
+        else table.num_rows
+    )
+    counts = {
+        "total_cards": int(table.num_rows),  # Individual card instances
+        "unique_cards": int(unique_names),  # Unique card names
+        "total_quantity": int(total_quantity),
+    }
+    return df, table, counts
+
+
+def read_sample_collection_file(path: str) -> SampleCollection:
+    """Read a sample collection CSV, preferring a Parquet copy that is at least as new as the CSV"""
+    mtime = os.path.getmtime(path)
+    cached = _SAMPLE_CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    cache_path = path + ".parquet"
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= mtime:
+        df: pd.DataFrame = pd.read_parquet(cache_path, dtype_backend="pyarrow")  # type: ignore
+    else:
+        # Arrow-backed parse: multithreaded reader, and columns convert to Python without re-boxing
+        df = pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")  # type: ignore
+        try:
+            df.to_parquet(cache_path, compression="zstd", index=False)
+        except OSError as e:
+            logger.warning("Could not write Parquet cache", path=cache_path, error=str(e))
+    # The table and counts only change with the file, so they're computed here once, off the event loop
+    sample = summarize_sample_collection(df)
+    _SAMPLE_CACHE[path] = (mtime, sample)
+    return sample
+
+
+@app.get("/api/load-sample-collection", response_model=None)
+async def load_sample_collection(
+    format: str = Query("json", description="'json' for one response body, 'ndjson' to stream stats then one card per line"),
+) -> Union[Dict[str, Any], Response]:
     try:
 
         # Look for any CSV files in user-data directory first, then fall back to sample
         user_data_dir = "data/user-data"
-        sample_files: List[str] = []
-
-        print(f"Looking for collections in: {user_data_dir}")
-        print(f"Directory exists: {os.path.exists(user_data_dir)}")
-
-        # Find all CSV files in user-data directory
-        if os.path.exists(user_data_dir):
-            csv_files = glob.glob(os.path.join(user_data_dir, "*.csv"))
-            print(f"Found CSV files: {csv_files}")
-            sample_files.extend(csv_files)
 
-        # Add sample collection as fallback
-        sample_files.append("sample-collection.csv")
+        logger.debug("Looking for sample collections", directory=user_data_dir)
 
-        print(f"All sample files to try: {sample_files}")
+        # Lazily walk user-data CSVs (iglob yields nothing if the directory is missing), then the
+        # bundled sample as fallback; the loop stops at the first file that loads
+        sample_files = itertools.chain(
+            glob.iglob(os.path.join(user_data_dir, "*.csv")),
+            ["sample-collection.csv"],
+        )
 
-        collection_df: Optional[pd.DataFrame] = None
+        sample: Optional[SampleCollection] = None
         used_path: Optional[str] = None
 
         for path in sample_files:
             try:
-                collection_df = pd.read_csv(path)  # type: ignore
+                # Parse in a worker thread so the event loop keeps serving other requests
+                sample = await asyncio.to_thread(read_sample_collection_file, path)
                 used_path = path
-                print(f"Successfully loaded collection from: {path}")
-                print(f"Detected columns: {list(collection_df.columns)}")
+                logger.debug("Loaded sample collection", path=path, columns=sample[1].column_names)
                 break
             except (
                 FileNotFoundError,
                 pd.errors.EmptyDataError,
                 pd.errors.ParserError,
+                pa.ArrowInvalid,
+                ValueError,
             ) as e:
-                print(f"Could not load {path}: {e}")
+                logger.warning("Could not load sample collection", path=path, error=str(e))
                 continue
 
-        if collection_df is None:
+        if sample is None:
             raise FileNotFoundError("No valid collection file found")
 
-        # Enrichment now handled via Supabase; use collection_df directly or query Supabase as needed
-        enriched_df = collection_df
-
-        # Convert to list of dictionaries
-        records: List[Dict[str, Any]] = enriched_df.to_dict("records")  # type: ignore
-        collection: List[Dict[str, Any]] = [
-            {str(k): v for k, v in record.items()} for record in records
-        ]  # Explicit type annotation
-
-        # Convert numpy types to native Python types for JSON serialization
-        collection = convert_numpy_types(collection)
-
-        # Basic stats
-        unique_names = (
-            enriched_df["name"].nunique()
-            if "name" in enriched_df.columns
-            else len(
-                enriched_df.drop_duplicates(subset=["Name"])
-                if "Name" in enriched_df.columns
-                else enriched_df
-            )
+        # Enrichment now handled via Supabase; use the parsed collection directly or query Supabase as needed
+        enriched_df, table, counts = sample
+
+        stats: Dict[str, Any] = {**counts, "source": used_path}
+
+        if format == "ndjson":
+            async def ndjson_rows() -> AsyncGenerator[bytes, None]:
+                yield orjson.dumps({"success": True, "stats": stats}) + b"\n"
+                # Convert one record batch at a time instead of the whole collection
+                for batch in table.to_batches():
+                    for row in batch.to_pylist():
+                        yield orjson.dumps(row) + b"\n"
+
+            return StreamingResponse(ndjson_rows(), media_type="application/x-ndjson")
+
+        # Serialize rows with pandas' C JSON writer and splice them into a pre-built body,
+        # skipping the per-row Python dicts and FastAPI's encoder pass
+        payload = (
+            b'{"success":true,"stats":'
+            + orjson.dumps(stats)
+            + b',"collection":'
+            + enriched_df.to_json(orient="records", double_precision=15).encode("utf-8")
+            + b"}"
         )
-        total_quantity = (
-            enriched_df["Quantity"].sum()
-            if "Quantity" in enriched_df.columns
-            else len(collection)
-        )
-
-        stats: Dict[str, Any] = {
-            "total_cards": int(
-                len(collection)
-            ),  # Individual card instances (should be 635)
-            "unique_cards": int(unique_names),  # Unique card names
-            "total_quantity": int(total_quantity),  # Should also be 635
-            "source": used_path,
-        }
-
-        return {"success": True, "collection": collection, "stats": stats}
+        return Response(content=payload, media_type="application/json")
 
     except Exception as e:
 
-        error_details = traceback.format_exc()
-        return {"success": False, "error": str(e), "details": error_details}
+        # The traceback goes to the logs (and Sentry), not to the client
+        logger.exception("Loading sample collection failed")
+        return {"success": False, "error": str(e)}
 
 
 # --- Robust CSV upload, enrichment, and Supabase save for collections ---
 
 
+def sse_event(event: str, data: Any) -> Dict[str, str]:
+    """Build an SSE event with its data encoded once by orjson (sse_starlette would otherwise str() the dict)"""
+    return {"event": event, "data": orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY).decode()}
+
+
+# Matched cards per user_cards upsert in the progress upload
+UPLOAD_BATCH_SIZE = 500
+
+# The card catalog is fetched once per process and refreshed in the background after the TTL
+CARD_LOOKUP_TTL = 3600
+_CARD_LOOKUP: Optional[Tuple[float, CardLookup]] = None
+_CARD_LOOKUP_LOCK = asyncio.Lock()
+_CARD_LOOKUP_REFRESH: Optional["asyncio.Task[CardLookup]"] = None
+
+
+async def refresh_card_lookup() -> CardLookup:
+    """Fetch the full card catalog into a new CardLookup, unless another caller just did"""
+    global _CARD_LOOKUP
+    async with _CARD_LOOKUP_LOCK:
+        if _CARD_LOOKUP is not None and time.monotonic() - _CARD_LOOKUP[0] < CARD_LOOKUP_TTL:
+            return _CARD_LOOKUP[1]
+        lookup = CardLookup(SUPABASE_URL or "", SUPABASE_SERVICE_KEY or "")
+        # fetch_all_cards pages through Supabase synchronously, so keep it off the event loop
+        await asyncio.to_thread(lookup.fetch_all_cards)
+        _CARD_LOOKUP = (time.monotonic(), lookup)
+        return lookup
+
+
+async def get_card_lookup() -> CardLookup:
+    """Return the shared CardLookup, serving a stale catalog while a refresh runs"""
+    global _CARD_LOOKUP_REFRESH
+    if _CARD_LOOKUP is None:
+        return await refresh_card_lookup()
+    if time.monotonic() - _CARD_LOOKUP[0] >= CARD_LOOKUP_TTL and (_CARD_LOOKUP_REFRESH is None or _CARD_LOOKUP_REFRESH.done()):
+        _CARD_LOOKUP_REFRESH = asyncio.create_task(refresh_card_lookup())
+    return _CARD_LOOKUP[1]
+
+
 @app.post("/api/collections/progress-upload")
 async def upload_collection_progress(
     file: UploadFile = File(...),
@@ -945,14 +1148,17 @@ async def upload_collection_progress(
     current_user: Dict[str, Any] = Depends(get_user_from_token)
 ) -> EventSourceResponse:
 
-    # Read and decode file outside the generator
-    content = await file.read()
-    print(f"[progress-upload] Read file content, size: {len(content)}", file=sys.stderr)
-    decoded = content.decode(errors="replace")
-    print(f"[progress-upload] Decoded file, first 100 chars: {decoded[:100]}", file=sys.stderr)
+    # Parse outside the generator (the upload is closed once the SSE response starts)
+    parsed_df: Optional[pd.DataFrame] = None
+    parse_error: Optional[str] = None
+    try:
+        parsed_df = await read_upload_csv(file)
+    except Exception as e:
+        parse_error = str(e)
 
     async def event_generator(
-        decoded: str,
+        df: Optional[pd.DataFrame],
+        parse_error: Optional[str],
         name: str,
         description: str,
         isPublic: bool,
@@ -960,14 +1166,17 @@ async def upload_collection_progress(
         collectionAction: str,
         collectionId: Optional[str],
         current_user: Dict[str, Any]
-    ) -> AsyncGenerator[dict[str, Any], None]:
-        print("[progress-upload] Starting event_generator", file=sys.stderr)
+    ) -> AsyncGenerator[Dict[str, str], None]:
+        logger.debug("Collection upload started", collection_action=collectionAction)
         try:
-            # Parse CSV
-            df: pd.DataFrame = pd.read_csv(io.StringIO(decoded))  # type: ignore
-            print(f"[progress-upload] Parsed CSV, shape: {df.shape}", file=sys.stderr)
-            df = normalize_csv_format(df)
-            print(f"[progress-upload] Normalized CSV, shape: {df.shape}", file=sys.stderr)
+            if df is None:
+                logger.warning("Collection upload CSV parse failed", error=parse_error)
+                yield sse_event("error", {"error": f"Failed to parse CSV: {parse_error}"})
+                return
+            logger.debug("Collection upload parsed CSV", shape=df.shape)
+            # Pandas work runs in a worker thread so other uploads and SSE clients aren't stalled
+            df = await asyncio.to_thread(normalize_csv_format, df)
+            logger.debug("Collection upload normalized CSV", shape=df.shape)
 
             # Group by unique card
             group_keys: list[str] = []
@@ -980,32 +1189,48 @@ async def upload_collection_progress(
             else:
                 group_keys = [col for col in ["Scryfall ID", "Set code", "Collector number", "Name"] if col in df.columns]
             if not group_keys:
-                print("[progress-upload] No suitable columns to group by.", file=sys.stderr)
-                yield {"event": "error", "data": {"error": "No suitable columns to group by."}}
+                logger.warning("Collection upload has no columns to group by", columns=list(df.columns))
+                yield sse_event("error", {"error": "No suitable columns to group by."})
                 return
 
             agg_dict = {"Quantity": "sum"}
             for col in df.columns:
                 if col != "Quantity" and col not in group_keys:
                     agg_dict[col] = "first"
-            grouped: pd.DataFrame = df.groupby(group_keys, dropna=False, as_index=False).agg(agg_dict)  # type: ignore
-            rows: List[Dict[str, Any]] = grouped.to_dict("records")  # type: ignore
+
+            def group_rows(df: pd.DataFrame) -> List[Dict[str, Any]]:
+                # Cast quantities once, column-wise; a blank or non-numeric quantity counts as one copy
+                df = df.assign(Quantity=pd.to_numeric(df["Quantity"], errors="coerce").astype("float64").fillna(1).astype("int64"))
+                if df.duplicated(subset=group_keys).any():
+                    grouped: pd.DataFrame = df.groupby(group_keys, dropna=False, as_index=False).agg(agg_dict)  # type: ignore
+                else:
+                    # Already one row per card (typical of Moxfield/Archidekt exports): skip the groupby
+                    grouped = df
+                # Normalize the match keys column-wise once (same result as normalize_name per row)
+                if "Name" in grouped.columns:
+                    grouped["_name_key"] = grouped["Name"].fillna("").astype(str).str.strip().str.lower().str.replace(r"[^a-z0-9 ]", "", regex=True)
+                if "Set code" in grouped.columns:
+                    grouped["_set_key"] = grouped["Set code"].fillna("").astype(str).str.strip().str.lower().str.replace(r"[^a-z0-9 ]", "", regex=True)
+                if "Collector number" in grouped.columns:
+                    # Collector number: only strip whitespace, do not normalize
+                    grouped["_collector_key"] = grouped["Collector number"].astype(str).str.strip()
+                # Arrow's to_pylist yields native Python scalars and None for nulls, avoiding to_dict's per-cell boxing
+                return pa.Table.from_pandas(grouped, preserve_index=False).to_pylist()
+
+            rows = await asyncio.to_thread(group_rows, df)
             total = len(rows)
-            print(f"[progress-upload] Grouped rows (unique cards): {total}", file=sys.stderr)
+            logger.debug("Collection upload grouped rows", unique_cards=total)
             if total == 0:
-                print("[progress-upload] No rows found in CSV.", file=sys.stderr)
-                yield {"event": "error", "data": {"error": "No rows found in CSV."}}
+                logger.warning("Collection upload CSV has no rows")
+                yield sse_event("error", {"error": "No rows found in CSV."})
                 return
 
             # Initialize CardLookup
-            SUPABASE_URL = os.getenv("SUPABASE_URL")
-            SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY") or os.getenv("SUPABASE_ANON_KEY")
             if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-                print("[progress-upload] Supabase credentials missing.", file=sys.stderr)
-                yield {"event": "error", "data": {"error": "Supabase credentials missing."}}
+                logger.error("Collection upload missing Supabase credentials")
+                yield sse_event("error", {"error": "Supabase credentials missing."})
                 return
-            card_lookup = CardLookup(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-            card_lookup.fetch_all_cards(diagnostics=True)
+            card_lookup = await get_card_lookup()
 
             # --- Efficient batch fetch using CardLookup.fetch_rows_by_field_values ---
             # 1. Gather all unique Scryfall IDs, (name, set, collector), and names
@@ -1016,18 +1241,15 @@ async def upload_collection_progress(
                 if row.get("Scryfall ID"):
                     scryfall_ids.add(row["Scryfall ID"])
                 elif row.get("Name") and row.get("Set code") and row.get("Collector number"):
-                    # Collector number: only strip whitespace, do not normalize
-                    collector_number_val = str(row["Collector number"]).strip()
-                    set_code_val = str(row["Set code"]).strip().lower()
-                    name_val = str(row["Name"]).strip()
-                    name_set_collector.add((normalize_name(name_val), normalize_name(set_code_val), collector_number_val))
+                    name_set_collector.add((row["_name_key"], row["_set_key"], row["_collector_key"]))
                 elif row.get("Name"):
-                    names.add(normalize_name(str(row["Name"]).strip()))
+                    names.add(row["_name_key"])
 
             # 2. Batch fetch cards by Scryfall ID
             card_id_map: dict[str | tuple[str, str, str], dict[str, Any]] = {}
             if scryfall_ids:
-                fetched = card_lookup.fetch_rows_by_field_values(
+                fetched = await asyncio.to_thread(
+                    card_lookup.fetch_rows_by_field_values,
                     table="cards", field="id", values=scryfall_ids,
                     select="id,name,set,collector_number"
                 )
@@ -1040,7 +1262,8 @@ async def upload_collection_progress(
             if name_set_collector:
                 # Fetch all cards with matching set and collector_number
                 set_codes: set[str] = set([t[1] for t in name_set_collector])
-                fetched = card_lookup.fetch_rows_by_field_values(
+                fetched = await asyncio.to_thread(
+                    card_lookup.fetch_rows_by_field_values,
                     table="cards", field="set", values=set_codes,
                     select="id,name,set,collector_number"
                 )
@@ -1054,49 +1277,86 @@ async def upload_collection_progress(
                     if key in name_set_collector:
                         card_id_map[key] = c
                     else:
-                        # Debug: print keys that didn't match
-                        print(f"[progress-upload] No match for key: {key} in name_set_collector", file=sys.stderr)
+                        # Every card in the fetched sets lands here, so only log at debug level
+                        logger.debug("No prefetch match for key", key=key)
 
             # 4. Batch fetch by name (if needed)
             if names:
-                fetched = card_lookup.fetch_rows_by_field_values(
+                fetched = await asyncio.to_thread(
+                    card_lookup.fetch_rows_by_field_values,
                     table="cards", field="name", values=names,
                     select="id,name,set,collector_number"
                 )
                 for c in fetched:
                     card_id_map[normalize_name(c.get("name", ""))] = c
             user_id = current_user["id"]
-            print(f"[progress-upload] User ID: {user_id}", file=sys.stderr)
             if collectionAction == "new":
-                print(f"[progress-upload] Creating new collection: {name}", file=sys.stderr)
                 collection_id = await create_collection(user_id, name, description, isPublic)
-                print(f"[progress-upload] Created collection ID: {collection_id}", file=sys.stderr)
+                logger.info("Collection upload created collection", user_id=user_id, collection_id=collection_id)
             elif collectionAction == "update" and collectionId:
-                print(f"[progress-upload] Updating collection: {collectionId}", file=sys.stderr)
                 await update_collection(collectionId, name, description, isPublic)
                 collection_id = collectionId
-                print(f"[progress-upload] Updated collection ID: {collection_id}", file=sys.stderr)
+                logger.info("Collection upload updating collection", user_id=user_id, collection_id=collection_id)
             else:
-                print("[progress-upload] Invalid collection action or missing collectionId.", file=sys.stderr)
-                yield {"event": "error", "data": {"error": "Invalid collection action or missing collectionId."}}
+                logger.warning("Collection upload has invalid action", collection_action=collectionAction, collection_id=collectionId)
+                yield sse_event("error", {"error": "Invalid collection action or missing collectionId."})
                 return
 
-            user_card_ids: list[str] = []
             enriched_cards: List[Dict[str, Any]] = []
+            # Matched rows waiting to be written; flushed as one upsert and one link insert per batch
+            pending: List[Dict[str, Any]] = []
+
+            async def flush_pending() -> None:
+                user_card_map = await upsert_user_cards_batch(
+                    user_id,
+                    [(entry["card_id"], entry["quantity"], entry["condition"]) for entry in pending],
+                    inventoryPolicy,
+                )
+                await link_collection_cards_batch(collection_id, list(dict.fromkeys(user_card_map.values())))
+                for entry in pending:
+                    enriched_cards.append({
+                        "user_card_id": user_card_map.get((str(entry["card_id"]), str(entry["condition"]))),
+                        "card_id": entry["card_id"],
+                        "name": entry["name"],
+                        "set_code": entry["set_code"],
+                        "collector_number": entry["collector_number"],
+                        "quantity": entry["quantity"],
+                    })
+                pending.clear()
+
+            # Exact matching first; the fuzzy fallback is scored for all misses at once below
+            match_results: List[Dict[str, Any]] = []
+            # The same printing can appear on several rows (e.g. different conditions); resolve it once
+            resolved: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+            for row in rows:
+                scryfall_id = row.get("Scryfall ID")
+                if scryfall_id and scryfall_id in card_id_map:
+                    match_results.append({"status": "success", "card_id": scryfall_id, "error": None, "diagnostics": {"method": "scryfall_id"}})
+                    continue
+                key = (row.get("Name") or "", str(row.get("Set code") or ""), str(row.get("Collector number") or ""))
+                if key not in resolved:
+                    resolved[key] = card_lookup.robust_lookup(name=key[0], set_code=key[1], collector_number=key[2], fuzzy=False)
+                match_results.append(resolved[key])
+            unmatched = [idx for idx, result in enumerate(match_results) if not result.get("card_id") and rows[idx].get("Name")]
+            if unmatched:
+                unmatched_names = list(dict.fromkeys(rows[idx]["Name"] for idx in unmatched))
+                fuzzy_names = await asyncio.to_thread(card_lookup.fuzzy_lookup_many, unmatched_names)
+                fuzzy_by_name = dict(zip(unmatched_names, fuzzy_names))
+                for idx in unmatched:
+                    match_name = fuzzy_by_name[rows[idx]["Name"]]
+                    match_ids = card_lookup.card_id_map.get(match_name, []) if match_name and card_lookup.card_id_map else []
+                    if match_ids:
+                        match_results[idx].update({"match_status": "fuzzy", "card_id": match_ids[0], "method": "fuzzy"})
+
+            # ~1% progress granularity is all the client's bar needs; the last row always reports
+            progress_step = max(1, total // 100)
+            next_progress = 0
 
             for idx, row in enumerate(rows):
-                print(f"[progress-upload] Processing row {idx+1}/{total}", file=sys.stderr)
-                scryfall_id = row.get("Scryfall ID")
                 set_code = row.get("Set code")
                 name_val = row.get("Name")
                 collector_number = row.get("Collector number")
-
-                # Use robust_lookup for all matching
-                match_result: Dict[str, Any] = {}
-                if scryfall_id and scryfall_id in card_id_map:
-                    match_result: Dict[str, Any] = {"status": "success", "card_id": scryfall_id, "error": None, "diagnostics": {"method": "scryfall_id"}}
-                else:
-                    match_result = card_lookup.robust_lookup(name=name_val or "", set_code=set_code or "", collector_number=collector_number or "")
+                match_result = match_results[idx]
 
                 card_id = match_result.get("card_id")
                 diagnostics = match_result.get("diagnostics", {})
@@ -1104,7 +1364,7 @@ async def upload_collection_progress(
                 status = match_result.get("status")
 
                 if not card_id:
-                    print(f"[progress-upload] Card not found for row {idx+1}: {name_val}, set={set_code}, collector={collector_number}", file=sys.stderr)
+                    logger.debug("Progress upload card not found", row=idx + 1, name=name_val, set_code=set_code, collector_number=collector_number)
                     preview: Dict[str, Any] = {
                         "name": name_val,
                         "set_code": set_code,
@@ -1115,39 +1375,49 @@ async def upload_collection_progress(
                         "diagnostics": diagnostics,
                         "status": status
                     }
-                    yield {"event": "progress", "data": {"current": idx+1, "total": total, "percent": int(100*(idx+1)/total), "preview": preview}}
+                    if idx >= next_progress or idx + 1 == total:
+                        next_progress = idx + progress_step
+                        yield sse_event("progress", {"current": idx+1, "total": total, "percent": int(100*(idx+1)/total), "preview": preview})
                     continue
-                quantity = int(row.get("Quantity", 1))
-                condition = row.get("Condition", "Near Mint")
-                print(f"[progress-upload] Upserting user_card: card_id={card_id}, quantity={quantity}", file=sys.stderr)
-                user_card_id = await upsert_user_card(user_id, card_id, quantity, condition, inventoryPolicy)
-                print(f"[progress-upload] Upserted user_card_id: {user_card_id}", file=sys.stderr)
-                user_card_ids.append(user_card_id)
-
-                print(f"[progress-upload] Linking user_card_id {user_card_id} to collection_id {collection_id}", file=sys.stderr)
-                await link_collection_card(collection_id, user_card_id)
-
-                preview = {
+                pending.append({
+                    "card_id": card_id,
+                    "quantity": row["Quantity"],
+                    "condition": row.get("Condition", "Near Mint"),
                     "name": name_val,
                     "set_code": set_code,
                     "collector_number": collector_number,
-                    "idx": idx,
-                    "total": total,
-                    "card_id": card_id,
-                    "status": status,
-                    "diagnostics": diagnostics
-                }
-                yield {"event": "progress", "data": {"current": idx+1, "total": total, "percent": int(100*(idx+1)/total), "preview": preview}}
-                enriched_cards.append({"user_card_id": user_card_id, "card_id": card_id, "name": name_val, "set_code": set_code, "collector_number": collector_number, "quantity": quantity})
-
-            print("[progress-upload] Done processing all rows. Sending final event.", file=sys.stderr)
-            yield {"event": "done", "data": {"collection": enriched_cards, "total": total, "collection_id": collection_id}}
+                })
+
+                if len(pending) >= UPLOAD_BATCH_SIZE or idx + 1 == total:
+                    logger.debug("Progress upload writing batch", cards=len(pending), row=idx + 1, total=total)
+                    await flush_pending()
+                if idx >= next_progress or idx + 1 == total:
+                    next_progress = idx + progress_step
+                    preview = {
+                        "name": name_val,
+                        "set_code": set_code,
+                        "collector_number": collector_number,
+                        "idx": idx,
+                        "total": total,
+                        "card_id": card_id,
+                        "status": status,
+                        "diagnostics": diagnostics
+                    }
+                    yield sse_event("progress", {"current": idx+1, "total": total, "percent": int(100*(idx+1)/total), "preview": preview})
+
+            # The last rows may have been unmatched, leaving earlier matches unwritten
+            if pending:
+                await flush_pending()
+
+            logger.info("Collection upload finished", collection_id=collection_id, total=total)
+            yield sse_event("done", {"collection": enriched_cards, "total": total, "collection_id": collection_id})
         except Exception as e:
-            print(f"[progress-upload] Exception: {e}\n{traceback.format_exc()}", file=sys.stderr)
-            yield {"event": "error", "data": {"error": str(e), "details": traceback.format_exc()}}
+            logger.exception("Collection upload failed", collection_id=collectionId)
+            yield sse_event("error", {"error": str(e)})
 
     return EventSourceResponse(event_generator(
-        decoded,
+        parsed_df,
+        parse_error,
         name,
         description,
         isPublic,
@@ -1159,5 +1429,11 @@ async def upload_collection_progress(
 
 # Entry point for running the FastAPI app with Uvicorn
 if __name__ == "__main__":
-    
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # The reloader doubles the process count and rebuilds module-level caches, so it is opt-in
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", "8000")),
+        reload=os.getenv("SPARKROOT_DEV") == "1",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
@@ -1,4 +1,5 @@
 import os
+import asyncio
 from typing import Any, Optional, Dict
 import asyncpg  # type: ignore # Add this import
 
@@ -8,11 +9,15 @@ class SupabaseDB:
         if not self.database_url:
             raise ValueError("DATABASE_URL or SUPABASE_DB_URL environment variable is required")
         self.pool: Optional[asyncpg.pool.Pool] = None  # Correct type annotation
+        # Serializes lazy pool creation so concurrent first queries don't each open a pool
+        self._pool_lock = asyncio.Lock()
     
     async def get_connection(self) -> Any:
         """Get database connection from pool"""
         if not self.pool:
-            await self.init_pool()
+            async with self._pool_lock:
+                if not self.pool:
+                    await self.init_pool()
         return await self.pool.acquire()  # type: ignore
     
     async def init_pool(self) -> None:
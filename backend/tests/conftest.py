@@ -0,0 +1,12 @@
+import os
+import sys
+
+# main.py and its imports read these at import time; point them at dummies so the app can be
+# built without live Supabase, Postgres or Redis (the parse endpoints touch none of them)
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "test.anon.key")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test.service.key")
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/test")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,26 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from auth_supabase_rest import get_user_from_token
+
+CSV = b"Name,Set code,Collector number,Quantity\nSol Ring,c21,263,2\nArcane Signet,c21,236,1\n"
+
+
+@pytest.fixture
+def client():
+    main.app.dependency_overrides[get_user_from_token] = lambda: {"id": "user-1", "access_token": "token"}
+    # No context manager: skipping lifespan keeps the shutdown hook from closing the shared HTTP client
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+@pytest.mark.parametrize("path", ["/api/parse-collection-public", "/api/parse-collection"])
+def test_parse_collection_endpoints(client, path):
+    resp = client.post(path, files={"file": ("collection.csv", CSV, "text/csv")})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["success"] is True
+    assert [card["Name"] for card in body["collection"]] == ["Sol Ring", "Arcane Signet"]
+    assert body["stats"]["total_quantity"] == 3
+    assert body["stats"]["original_filename"] == "collection.csv"
@@ -1,7 +1,7 @@
 import os
-import httpx
 from fastapi import APIRouter, HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from auth_supabase_rest import http_client
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_ANON_KEY: str = os.getenv("SUPABASE_ANON_KEY") or ""
@@ -18,13 +18,12 @@ async def verify_totp(code: str, credentials: HTTPAuthorizationCredentials = Dep
         "Authorization": f"Bearer {str(jwt_token)}",
         "Content-Type": "application/json"
     }
-    async with httpx.AsyncClient() as client:
-        resp = await client.post(
-            f"{SUPABASE_URL}/auth/v1/mfa/verify",
-            headers=headers,
-            json={"factor_type": "totp", "code": code}
-        )
-        if resp.status_code == 200:
-            return {"success": True}
-        else:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid TOTP code")
+    resp = await http_client.post(
+        f"{SUPABASE_URL}/auth/v1/mfa/verify",
+        headers=headers,
+        json={"factor_type": "totp", "code": code}
+    )
+    if resp.status_code == 200:
+        return {"success": True}
+    else:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid TOTP code")
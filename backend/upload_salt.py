@@ -183,7 +183,10 @@ def upload_to_supabase(supabase: Client, salt_df: pd.DataFrame, card_id_map: Dic
     skipped_already_in_salt = 0
     skipped_no_card_id = 0
     skipped_names: List[str] = []
-    for _, row in salt_df.iterrows():
+    # Plain tuples zipped with the headers once, instead of a Series per row from iterrows()
+    columns = list(salt_df.columns)
+    for values in salt_df.itertuples(index=False, name=None):
+        row = dict(zip(columns, values))
         name = normalize_name(str(row["Name"]))
         card_ids = card_id_map.get(name, [])
         if not card_ids:
@@ -1,12 +1,40 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+import uuid
 import pandas as pd
+import pyarrow.csv as pacsv
 from supabase_db import db
-from typing import Any, List, Dict, Union, cast
+from typing import Any, List, Dict, Optional, Tuple, Union, cast
+
+def read_csv_arrow(source: Any, delimiter: str = ",", encoding: str = "utf8") -> pd.DataFrame:
+    """Parse a CSV (path, bytes buffer or file object) with Arrow's multithreaded reader into an Arrow-backed DataFrame"""
+    table = pacsv.read_csv(
+        source,
+        read_options=pacsv.ReadOptions(encoding=encoding),
+        parse_options=pacsv.ParseOptions(delimiter=delimiter),
+        # Treat empty/NA cells in text columns as nulls, as pandas' reader does
+        convert_options=pacsv.ConvertOptions(strings_can_be_null=True),
+    )
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+
+CSV_DELIMITERS = (",", ";", "\t", "|")
+
+
+def detect_delimiter(sample: bytes) -> str:
+    """Pick the delimiter from the header line, falling back to counts over the whole sample when that's ambiguous"""
+    header = sample.split(b"\n", 1)[0]
+    counts = sorted(((header.count(d.encode()), d) for d in CSV_DELIMITERS), reverse=True)
+    if counts[0][0] > 0 and counts[0][0] != counts[1][0]:
+        return counts[0][1]
+    best = max(CSV_DELIMITERS, key=lambda d: sample.count(d.encode()))
+    return best if sample.count(best.encode()) else ","
+
 
 def normalize_csv_format(df: pd.DataFrame) -> pd.DataFrame:
     """Normalize different CSV formats (ManaBox, Moxfield, etc.) to a standard format"""
-    # Create a copy to avoid modifying the original
-    normalized_df = df.copy()
-
     print(f"Input columns: {list(df.columns)}")
 
     # Enhanced column mapping with flexible alternatives
@@ -52,12 +80,10 @@ def normalize_csv_format(df: pd.DataFrame) -> pd.DataFrame:
         "Rarity": "Rarity",
     }
 
-    # Apply column mapping
-    columns_mapped: List[str] = []
-    for old_name, new_name in column_mapping.items():
-        if old_name in normalized_df.columns:
-            normalized_df = normalized_df.rename(columns={old_name: new_name})
-            columns_mapped.append(f"{old_name} → {new_name}")
+    # Apply column mapping in a single rename, which also gives us the copy we modify below
+    present_mapping = {old_name: new_name for old_name, new_name in column_mapping.items() if old_name in df.columns}
+    normalized_df = df.rename(columns=present_mapping)
+    columns_mapped: List[str] = [f"{old_name} → {new_name}" for old_name, new_name in present_mapping.items()]
 
     if columns_mapped:
         print(f"Mapped columns: {columns_mapped}")
@@ -123,24 +149,19 @@ def normalize_csv_format(df: pd.DataFrame) -> pd.DataFrame:
 
 def expand_collection_by_quantity(df: pd.DataFrame) -> pd.DataFrame:
     """Expand collection dataframe to include one row per individual card (accounting for quantities)"""
-    expanded_rows: List[Dict[str, Any]] = []
-
-    
-    for _, row in df.iterrows():  # type: ignore
-        quantity_val = cast(int, row.get("Quantity", 1))  # type: ignore
-        try:
-            quantity = int(quantity_val)
-        except Exception:
-            quantity = 1
-        for i in range(quantity):
-            card_row = cast(Dict[str, Any], row.to_dict())  # type: ignore
-            card_row["card_instance"] = i + 1
-            expanded_rows.append(card_row)
-
-    return pd.DataFrame(expanded_rows)
+    df = df.reset_index(drop=True)
+    # Unparseable quantities count as one copy; fractional ones truncate and negatives expand to nothing, as int() would
+    if "Quantity" in df.columns:
+        quantities = pd.to_numeric(df["Quantity"], errors="coerce").astype("float64").fillna(1).astype("int64").clip(lower=0)  # type: ignore
+    else:
+        quantities = pd.Series(1, index=df.index)
+    # Repeat each row's index label by its quantity, then number the copies within each original row
+    expanded = df.loc[df.index.repeat(quantities)]
+    expanded = expanded.assign(card_instance=expanded.groupby(level=0).cumcount() + 1)
+    return expanded.reset_index(drop=True)
 
 def load_collection(filepath: str) -> pd.DataFrame:
-    df: pd.DataFrame = pd.read_csv(filepath)  # type: ignore[no-untyped-call]
+    df: pd.DataFrame = read_csv_arrow(filepath)
     # Normalize format
     df = normalize_csv_format(df)
     return df
@@ -179,6 +200,47 @@ async def upsert_user_card(
         raise RuntimeError("Database returned None for upsert_user_card query.")
     return row['id']
 
+USER_CARD_UPSERT_SQL = {
+    "add": "user_cards.quantity + EXCLUDED.quantity",
+    "replace": "EXCLUDED.quantity",
+}
+
+
+async def upsert_user_cards_batch(
+    user_id: Union[int, str],
+    cards: List[Tuple[Union[int, str], int, Any]],
+    policy: str = "add"
+) -> Dict[Tuple[str, str], Any]:
+    """
+    Upsert many (card_id, quantity, condition) entries into user_cards in one statement.
+    Returns {(card_id, condition): user_card_id}, keyed by their string forms.
+    """
+    if policy not in USER_CARD_UPSERT_SQL:
+        raise ValueError("Unknown policy: must be 'add' or 'replace'")
+    # ON CONFLICT can't touch the same row twice in one statement, so merge repeats the way
+    # sequential upserts would: 'add' sums them, 'replace' keeps the last quantity
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for card_id, quantity, condition in cards:
+        key = (str(card_id), str(condition))
+        if key in merged and policy == "add":
+            merged[key]["quantity"] += quantity
+        else:
+            merged[key] = {"card_id": card_id, "quantity": quantity, "condition": condition}
+    if not merged:
+        return {}
+    # jsonb_populate_recordset takes its column types from user_cards itself
+    query = f"""
+    INSERT INTO user_cards (user_id, card_id, quantity, condition)
+    SELECT $1, r.card_id, r.quantity, r.condition
+    FROM jsonb_populate_recordset(NULL::user_cards, $2::jsonb) AS r
+    ON CONFLICT (user_id, card_id, condition)
+    DO UPDATE SET quantity = {USER_CARD_UPSERT_SQL[policy]}
+    RETURNING id, card_id, condition
+    """
+    payload = json.dumps(list(merged.values()), default=str)
+    rows: List[Dict[str, Any]] = await db.execute_query(query, (user_id, payload), fetch=True)  # type: ignore
+    return {(str(row["card_id"]), str(row["condition"])): row["id"] for row in rows}
+
 async def create_collection(
     user_id: Union[int, str],
     name: str,
@@ -229,6 +291,22 @@ async def link_collection_card(
     """
     await db.execute_query(query, (collection_id, user_card_id))  # type: ignore
 
+async def link_collection_cards_batch(
+    collection_id: Union[int, str],
+    user_card_ids: List[Any]
+) -> None:
+    """Link many user_cards to a collection in one statement"""
+    if not user_card_ids:
+        return
+    query = """
+    INSERT INTO collection_cards (collection_id, user_card_id)
+    SELECT $1, r.user_card_id
+    FROM jsonb_populate_recordset(NULL::collection_cards, $2::jsonb) AS r
+    ON CONFLICT DO NOTHING
+    """
+    payload = json.dumps([{"user_card_id": user_card_id} for user_card_id in user_card_ids], default=str)
+    await db.execute_query(query, (collection_id, payload))  # type: ignore
+
 async def upload_collection_from_csv(
     user_id: Union[int, str],
     collection_df: pd.DataFrame,
@@ -257,7 +335,8 @@ async def upload_collection_from_csv(
     else:
         raise ValueError("collection_action must be 'new' or 'update'")
 
-    for _, row in collection_df.iterrows():  # type: ignore
+    # Plain dict records avoid building a Series per row like iterrows() does
+    for row in collection_df.to_dict("records"):  # type: ignore
         scryfall_id = cast(str, row.get("Scryfall ID", ""))  # type: ignore
         set_code = cast(str, row.get("Set code", ""))  # type: ignore
         collector_number = cast(str, row.get("Collector number", ""))  # type: ignore
@@ -288,6 +367,118 @@ async def upload_collection_from_csv(
     return collection_id
 
 
+class QueryBatcher:
+    """
+    Coalesces concurrent single-key lookups (across rows and requests) into one
+    `column = ANY($1)` query. Callers queue a key and await a future; a background task
+    drains up to max_batch keys, or whatever arrived within max_wait seconds, per query.
+    With cache_size set, found rows are also kept in an in-process LRU for cache_ttl seconds.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        key_column: str,
+        max_batch: int = 200,
+        max_wait: float = 0.02,
+        cache_size: int = 0,
+        cache_ttl: float = 86400,
+    ):
+        self.query = f"SELECT * FROM {table} WHERE {key_column} = ANY($1)"
+        self.key_column = key_column
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[Any, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue[Tuple[Any, asyncio.Future[Optional[Dict[str, Any]]]]]] = None
+        self._worker: Optional[asyncio.Task[None]] = None
+
+    def params(self, keys: List[Any]) -> Tuple[Any, ...]:
+        return (keys,)
+
+    def row_key(self, row: Dict[str, Any]) -> Any:
+        return str(row[self.key_column])
+
+    async def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        """Return the row whose key column equals key, or None"""
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                return cached[1]
+            del self._cache[key]
+        if self._queue is None or self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run(self._queue))
+        future: asyncio.Future[Optional[Dict[str, Any]]] = asyncio.get_running_loop().create_future()
+        await self._queue.put((key, future))
+        return await future
+
+    async def _run(self, queue: "asyncio.Queue[Tuple[Any, asyncio.Future[Optional[Dict[str, Any]]]]]") -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            keys = list({key for key, _ in batch})
+            try:
+                rows = await db.execute_query(self.query, self.params(keys), fetch=True)  # type: ignore
+                by_key: Dict[Any, Dict[str, Any]] = {self.row_key(row): row for row in rows}  # type: ignore
+                if self.cache_size:
+                    expires = time.monotonic() + self.cache_ttl
+                    for row_key, row in by_key.items():
+                        self._cache[row_key] = (expires, row)
+                        self._cache.move_to_end(row_key)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                for key, future in batch:
+                    if not future.done():
+                        future.set_result(by_key.get(key))
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+class PairQueryBatcher(QueryBatcher):
+    """QueryBatcher keyed on a pair of text columns, e.g. (set, collector_number)"""
+
+    def __init__(self, table: str, key_columns: Tuple[str, str], **kwargs: Any):
+        super().__init__(table, key_columns[0], **kwargs)
+        self.key_columns = key_columns
+        first, second = key_columns
+        self.query = (
+            f"SELECT t.* FROM {table} t JOIN unnest($1::text[], $2::text[]) AS k(a, b) "
+            f"ON t.{first} = k.a AND t.{second} = k.b"
+        )
+
+    def params(self, keys: List[Any]) -> Tuple[Any, ...]:
+        return ([key[0] for key in keys], [key[1] for key in keys])
+
+    def row_key(self, row: Dict[str, Any]) -> Any:
+        return (str(row[self.key_columns[0]]), str(row[self.key_columns[1]]))
+
+
+# The card catalog changes at most daily, so hot rows are served from memory across requests
+card_batcher = QueryBatcher("cards", "id", cache_size=20000)
+printing_batcher = PairQueryBatcher("cards", ("set", "collector_number"), cache_size=20000)
+set_batcher = QueryBatcher("sets", "code", cache_size=2000)
+
+
+def is_uuid(value: Any) -> bool:
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
 
 
 async def enrich_single_row_with_scryfall(row: Dict[str, Any]) -> Dict[str, Any]:
@@ -299,15 +490,22 @@ async def enrich_single_row_with_scryfall(row: Dict[str, Any]) -> Dict[str, Any]
     scryfall_id = row.get("Scryfall ID", "")
     set_code = row.get("Set code", "")
     collector_number = row.get("Collector number", "")
-    card_query = """
-        SELECT * FROM cards WHERE id = $1 OR (set = $2 AND collector_number = $3)
-    """
-    card_row: Dict[str, Any] | None = await db.execute_query_one(card_query, (scryfall_id, set_code, collector_number))  # type: ignore[reportUnknownVariableType,reportUnknownMemberType]
+    card_row: Dict[str, Any] | None = None
+    # Well-formed Scryfall IDs, then (set, collector_number), go through the shared batchers
+    # (one query per batch of rows); only a malformed ID still needs the per-row query
+    if scryfall_id and is_uuid(scryfall_id):
+        card_row = await card_batcher.get(str(scryfall_id))
+    if card_row is None and set_code and collector_number:
+        card_row = await printing_batcher.get((str(set_code), str(collector_number)))
+    if card_row is None and scryfall_id and not is_uuid(scryfall_id):
+        card_query = """
+            SELECT * FROM cards WHERE id = $1 OR (set = $2 AND collector_number = $3)
+        """
+        card_row = await db.execute_query_one(card_query, (scryfall_id, set_code, collector_number))  # type: ignore[reportUnknownVariableType,reportUnknownMemberType]
     set_row: Dict[str, Any] | None = None
     set_icon_svg_uri: str | None = None
     if card_row and cast(Dict[str, Any], card_row).get("set"):  # type: ignore[reportUnknownMemberType]
-        set_query = "SELECT * FROM sets WHERE code = $1"
-        set_row = await db.execute_query_one(set_query, (card_row["set"],))  # type: ignore[reportUnknownVariableType,reportUnknownMemberType]
+        set_row = await set_batcher.get(str(card_row["set"]))  # type: ignore[reportUnknownMemberType]
         if set_row:
             set_icon_svg_uri = set_row.get("icon_svg_uri")  # type: ignore[reportUnknownMemberType]
 
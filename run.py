@@ -6,6 +6,8 @@ This file allows Railway to start the FastAPI app from the root directory
 
 import sys
 import os
+import importlib.util
+import signal
 import subprocess
 import threading
 from pathlib import Path
@@ -30,12 +32,20 @@ def main():
     def start_fastapi():
         try:
             import uvicorn
-            from backend.main import app
             port = int(os.environ.get("PORT", 8000))
+            # uvloop isn't available on Windows dev machines; fall back to the stdlib loop there
+            loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+            # Several server processes so one busy request can't stall every other client.
+            # Workers need an import string, and the supervisor must run in the main thread.
+            # Each worker also starts its own DECK_POOL, so the default stays small
+            workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
             uvicorn.run(
-                app,
+                "backend.main:app",
                 host="0.0.0.0",
                 port=port,
+                loop=loop,
+                http="httptools",
+                workers=workers,
                 log_level="info"
             )
         except ImportError as e:
@@ -59,25 +69,26 @@ def main():
             traceback.print_exc()
             return None
 
-    # Start FastAPI in a thread so main process can monitor both
-    fastapi_thread = threading.Thread(target=start_fastapi, daemon=True)
-    fastapi_thread.start()
+    def watch_worker(worker_proc):
+        worker_proc.wait()
+        print(f"Worker process exited with code {worker_proc.returncode}")
+        # Stop the API too, so the platform restarts both together
+        os.kill(os.getpid(), signal.SIGINT)
+
     worker_proc = start_worker()
+    if worker_proc:
+        threading.Thread(target=watch_worker, args=(worker_proc,), daemon=True).start()
 
-    # Wait for FastAPI thread to finish (should run forever unless error)
+    # Run FastAPI in the main thread (runs forever unless error or shutdown signal)
+    result = 0
     try:
-        while fastapi_thread.is_alive():
-            fastapi_thread.join(timeout=2)
-            # Optionally, monitor worker_proc.poll() for exit status
-            if worker_proc and worker_proc.poll() is not None:
-                print(f"Worker process exited with code {worker_proc.returncode}")
-                break
+        result = start_fastapi()
     except KeyboardInterrupt:
         print("Received KeyboardInterrupt, shutting down...")
-        if worker_proc:
+    finally:
+        if worker_proc and worker_proc.poll() is None:
             worker_proc.terminate()
-        return 0
-    return 0
+    return result or 0
 
 if __name__ == "__main__":
     exit(main())